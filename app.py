@@ -1,7 +1,12 @@
+import pandas as pd
 import streamlit as st
 from streamlit_option_menu import option_menu
 import pages
 import utils.model_utils
+import utils.shared_cache
+import utils.shadow
+import utils.session_store
+import utils.timing
 
 # Config
 st.set_page_config(
@@ -17,38 +22,76 @@ try:
 except:
     pass
 
-# Global model
+# Per-stage timings for this run (panel toggle lives in the sidebar below)
+show_perf = st.session_state.get("show_perf_panel", False)
+timing_on = show_perf or utils.timing.always_enabled()
+if timing_on:
+    utils.timing.start_run(session=utils.session_store.current_session_id())
+
+# Global model (memory-mapped from the shared cache when run via launch_cluster.py)
 @st.cache_resource
 def get_model():
+    cache_dir = utils.shared_cache.shared_cache_dir()
+    if cache_dir:
+        return utils.shared_cache.load_shared_model(cache_dir)
     return utils.model_utils.load_churn_model()
 
 model_data = get_model()
 
+# Challenger shadow scoring, only when CHURN_CHALLENGER_MODEL points at a model
+@st.cache_resource
+def get_shadow():
+    challenger = utils.shadow.load_challenger()
+    if challenger is None:
+        return None
+    return utils.shadow.ShadowScorer(model_data["pipeline"], model_data["threshold"], challenger)
+
+shadow = get_shadow()
+
 # Optional direct access (not required, but safe)
 pipeline = model_data["pipeline"]
 threshold = model_data["threshold"]
 feature_names = model_data["feature_names"]
 metrics = model_data["metrics"]
 
-# Navigation
+# Navigation (?page=<name> opens a page directly, e.g. for links and load tests)
+PAGES = ["Dashboard", "Single User Prediction", "Mass Prediction", "Metrics", "Insights"]
+requested_page = st.query_params.get("page")
 with st.sidebar:
     st.markdown("## Churn Prediction Dashboard Menu")
     selected = option_menu(
         menu_title=None,
-        options=["Dashboard", "Single User Prediction", "Mass Prediction", "Metrics", "Insights"],
+        options=PAGES,
         icons=["bar-chart", "person", "table", "graph-up", "lightbulb"],
         menu_icon="cast",
-        default_index=0,
+        default_index=PAGES.index(requested_page) if requested_page in PAGES else 0,
     )
+    st.toggle("Show performance panel", key="show_perf_panel")
 
 # Page map
 page_map = {
     "Dashboard": pages.Dashboard(model_data).render,
     "Single User Prediction": pages.Prediction(model_data).render,
-    "Mass Prediction": pages.Batch(model_data).render,
-    "Metrics": pages.Metrics(model_data).render,
+    "Mass Prediction": pages.Batch(model_data, shadow).render,
+    "Metrics": pages.Metrics(model_data, shadow).render,
     "Insights": pages.Insights(model_data).render,
 }
 
 # Render page
-page_map[selected]()
+utils.timing.set_page(selected)
+with utils.timing.timed("page_render"):
+    page_map[selected]()
+
+# Performance panel
+if timing_on:
+    records = utils.timing.finish_run()
+    if show_perf and records:
+        with st.expander("Performance (this run)", expanded=True):
+            perf = pd.DataFrame(records)
+            st.dataframe(perf, use_container_width=True, hide_index=True)
+            st.caption(f"Timed stages total: {perf['ms'].sum():,.1f} ms")
+            store = utils.session_store.session_store()
+            st.caption(
+                f"Scored batches in memory: {store.session_bytes(utils.session_store.current_session_id()) / 2**20:,.1f} MB "
+                f"this session, {store.memory_bytes / 2**20:,.1f} MB of {store.cap_bytes / 2**20:,.0f} MB across all sessions"
+            )
@@ -0,0 +1,97 @@
+"""Benchmark parse time and memory on a wide CRM-style export.
+
+Compares the old upload path (parse every column, then select the model
+columns) with utils.file_utils.read_model_columns. Each variant runs in a
+fresh process and reports its peak RSS growth while parsing.
+
+    python -m benchmarks.csv_reader_bench --rows 500000 --extra-cols 60
+"""
+import argparse
+import multiprocessing as mp
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.shared_memory_bench import make_batch
+
+
+def make_wide_csv(path, n_rows, extra_cols, seed=0):
+    """Model columns with CRM-style headers plus extra_cols unrelated columns"""
+    rng = np.random.default_rng(seed)
+    df = make_batch(n_rows, seed)
+    df.columns = [c.title() if i % 2 else f" {c.upper()} " for i, c in enumerate(df.columns)]
+    for i in range(extra_cols):
+        if i % 3 == 0:
+            df[f"note_{i}"] = rng.choice(["call back", "email sent", "no answer", "vip"], n_rows)
+        else:
+            df[f"metric_{i}"] = rng.random(n_rows)
+    df.to_csv(path, index=False)
+
+
+def _vm_kb(key):
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith(key):
+                return int(line.split()[1])
+    return 0
+
+
+def _old_path(path):
+    from utils.file_utils import MODEL_FEATURES
+    raw = pd.read_csv(path)
+    raw.columns = [c.strip().lower() for c in raw.columns]
+    return raw[[c for c in MODEL_FEATURES if c in raw.columns]]
+
+
+def _new_path(path, engine=None):
+    from utils.file_utils import read_model_columns
+    return read_model_columns(path, engine=engine)
+
+
+VARIANTS = {
+    "old: parse all, then select": _old_path,
+    "new: sniffed columns (default engine)": _new_path,
+    "new: sniffed columns (c engine)": lambda path: _new_path(path, engine="c"),
+}
+
+
+def _run(variant, path, out):
+    fn = VARIANTS[variant]
+    import utils.file_utils  # noqa: F401  (import cost outside the measurement)
+    base = _vm_kb("VmRSS:")
+    start = time.perf_counter()
+    df = fn(path)
+    seconds = time.perf_counter() - start
+    out.put((seconds, (_vm_kb("VmHWM:") - base) / 1024, df.shape[1], df.memory_usage(deep=True).sum() / 2**20))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=500_000)
+    parser.add_argument("--extra-cols", type=int, default=60)
+    args = parser.parse_args()
+
+    ctx = mp.get_context("spawn")
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "wide.csv")
+        make_wide_csv(path, args.rows, args.extra_cols)
+        size_mb = os.path.getsize(path) / 2**20
+        for variant in VARIANTS:
+            out = ctx.Queue()
+            proc = ctx.Process(target=_run, args=(variant, path, out))
+            proc.start()
+            seconds, peak_mb, n_cols, frame_mb = out.get()
+            proc.join()
+            rows.append({"reader": variant, "seconds": seconds, "peak_rss_growth_mb": peak_mb,
+                         "columns": n_cols, "frame_mb": frame_mb})
+
+    print(f"{args.rows:,} rows x {11 + args.extra_cols} columns ({size_mb:,.0f} MB CSV)")
+    print(pd.DataFrame(rows).round(2).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
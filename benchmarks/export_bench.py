@@ -0,0 +1,58 @@
+"""Benchmark peak memory and time of result export, in-memory vs chunked.
+
+Peak memory is traced with tracemalloc, which slows everything down; compare
+the timings relative to each other rather than as absolute numbers.
+
+    python -m benchmarks.export_bench --rows 1000000
+"""
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.shared_memory_bench import make_batch
+from utils.export import available_formats, write_export
+
+
+def measure(fn):
+    tracemalloc.start()
+    start = time.perf_counter()
+    fn()
+    seconds = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return seconds, peak / 2**20
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--chunk-rows", type=int, default=100_000)
+    args = parser.parse_args()
+
+    df = make_batch(args.rows, seed=0)
+    df["churn_prob"] = np.random.default_rng(0).random(len(df))
+    df["prediction"] = (df["churn_prob"] > 0.4).astype(int)
+
+    rows = []
+    seconds, peak = measure(lambda: df.to_csv(index=False).encode())
+    rows.append({"export": "to_csv().encode() (old)", "seconds": seconds, "peak_mb": peak, "file_mb": np.nan})
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for fmt in available_formats():
+            path = os.path.join(tmp, "out")
+            seconds, peak = measure(lambda: write_export(df, fmt, path, args.chunk_rows))
+            rows.append({"export": fmt, "seconds": seconds, "peak_mb": peak,
+                         "file_mb": os.path.getsize(path) / 2**20})
+            os.remove(path)
+
+    print(f"{args.rows:,} rows, chunks of {args.chunk_rows:,}")
+    print(pd.DataFrame(rows).round(2).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
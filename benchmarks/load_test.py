@@ -0,0 +1,250 @@
+"""Load-test app.py with many concurrent headless sessions.
+
+Each simulated user opens a fresh session of the real app through
+Streamlit's AppTest (pages are selected with ?page=...), then performs a
+scenario's interactions. All sessions run in this process, as they would in
+one `streamlit run` server, so they share its caches, threads and memory.
+Mass Prediction sessions upload generated CSVs: the uploader widget cannot
+be driven headlessly, so the Batch page's upload hook reads the session's
+generated file instead, through the same parser.
+
+Reports latency percentiles per interaction, throughput and server RSS for
+every scenario. Run from the repository root:
+
+    python -m benchmarks.load_test --users 8 --iterations 3 --rows 20000
+    python -m benchmarks.load_test --scenarios mass_prediction --users 16 --max-p95-ms 5000
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.shared_memory_bench import make_batch
+
+APP = "app.py"
+# Session-state key holding the generated upload of a simulated session
+UPLOAD_KEY = "_load_test_upload"
+
+
+def _open(page, timeout):
+    from streamlit.testing.v1 import AppTest
+    at = AppTest.from_file(APP, default_timeout=timeout)
+    at.query_params = {"page": page}
+    return at
+
+
+def _widget(widgets, label):
+    """First widget whose label starts with label"""
+    for widget in widgets:
+        if widget.label.startswith(label):
+            return widget
+    raise LookupError(f"no widget labelled {label!r}")
+
+
+def _dashboard(at, upload):
+    yield "open", at.run
+
+
+def _prediction(at, upload):
+    yield "open", at.run
+    yield "predict", lambda: _widget(at.button, "Predict").click().run()
+
+
+def _mass_prediction(at, upload):
+    at.session_state[UPLOAD_KEY] = upload
+    yield "upload_and_score", at.run
+    yield "filter", lambda: _widget(at.slider, "Show High Risk").set_value(0.5).run()
+
+
+def _insights(at, upload):
+    yield "open", at.run
+    yield "change_costs", lambda: _widget(at.number_input, "Cost per promotion").set_value(300).run()
+
+
+# scenario -> (page, interactions)
+SCENARIOS = {
+    "dashboard": ("Dashboard", _dashboard),
+    "prediction": ("Single User Prediction", _prediction),
+    "mass_prediction": ("Mass Prediction", _mass_prediction),
+    "insights": ("Insights", _insights),
+}
+
+
+def share_test_runtime():
+    """Let AppTest sessions overlap in one process.
+
+    AppTest installs a mock Runtime singleton at the start of every run and
+    clears it at the end, so a session finishing would pull the runtime out
+    from under the others. Pin one shared mock instead.
+    """
+    from unittest.mock import MagicMock
+    from streamlit import config
+    from streamlit.runtime import Runtime
+    from streamlit.runtime.caching.storage.dummy_cache_storage import MemoryCacheStorageManager
+    from streamlit.runtime.media_file_manager import MediaFileManager
+    from streamlit.runtime.memory_media_file_storage import MemoryMediaFileStorage
+
+    runtime = MagicMock(spec=Runtime)
+    runtime.media_file_mgr = MediaFileManager(MemoryMediaFileStorage("/mock/media"))
+    runtime.cache_storage_manager = MemoryCacheStorageManager()
+    Runtime.instance = classmethod(lambda cls: runtime)
+    Runtime.exists = classmethod(lambda cls: True)
+    # AppTest patches this option per run; keep it set so overlapping restores agree
+    config.set_option("global.appTest", True)
+
+
+def install_upload_hook():
+    """Serve each session's generated CSV in place of the file uploader"""
+    import streamlit as st
+    import pages.batch
+    from utils.file_utils import LABEL_COL, read_model_columns
+    from utils.timing import timed
+
+    def handle_generated_upload():
+        path = st.session_state.get(UPLOAD_KEY)
+        if path is None:
+            return None, None, None
+        with timed("upload_parse"):
+            df = read_model_columns(path, label_col=LABEL_COL)
+        return df, os.path.basename(path), None
+
+    pages.batch.handle_file_upload = handle_generated_upload
+
+
+def rss_mb():
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+class MemorySampler:
+    """Peak RSS of this process, sampled in the background"""
+
+    def __init__(self, interval=0.05):
+        self.interval = interval
+        self.peak = rss_mb()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, rss_mb())
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, rss_mb())
+        return False
+
+
+def simulate_user(scenario, iterations, upload, timeout):
+    """Run the scenario in a fresh session per iteration; returns (step, ms, error) records"""
+    page, interactions = SCENARIOS[scenario]
+    records = []
+    for _ in range(iterations):
+        at = _open(page, timeout)
+        for step, action in interactions(at, upload):
+            start = time.perf_counter()
+            error = None
+            try:
+                action()
+                if at.exception:
+                    error = at.exception[0].value
+            except Exception as e:  # timeouts and missing widgets count as failures
+                error = f"{type(e).__name__}: {e}"
+            records.append((step, (time.perf_counter() - start) * 1000, error))
+            if error:
+                break
+    return records
+
+
+def run_scenario(scenario, users, iterations, uploads, timeout):
+    rss_start = rss_mb()
+    with MemorySampler() as memory, ThreadPoolExecutor(max_workers=users) as pool:
+        start = time.perf_counter()
+        futures = [pool.submit(simulate_user, scenario, iterations, uploads[i % len(uploads)], timeout)
+                   for i in range(users)]
+        records = [r for f in futures for r in f.result()]
+        wall = time.perf_counter() - start
+
+    rows = []
+    for step in dict.fromkeys(r[0] for r in records):
+        ms = np.array([r[1] for r in records if r[0] == step and r[2] is None])
+        errors = [r[2] for r in records if r[0] == step and r[2] is not None]
+        p50, p90, p95, p99 = np.percentile(ms, [50, 90, 95, 99]) if len(ms) else [np.nan] * 4
+        rows.append({
+            "scenario": scenario, "step": step, "users": users, "requests": len(ms) + len(errors),
+            "errors": len(errors), "p50_ms": p50, "p90_ms": p90, "p95_ms": p95, "p99_ms": p99,
+            "max_ms": ms.max() if len(ms) else np.nan,
+            "throughput_rps": len(ms) / wall,
+            "rss_start_mb": rss_start, "rss_peak_mb": memory.peak,
+            "first_error": errors[0] if errors else None,
+        })
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scenarios", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--users", type=int, default=8, help="concurrent sessions per scenario")
+    parser.add_argument("--iterations", type=int, default=3, help="sessions each user opens in turn")
+    parser.add_argument("--rows", type=int, default=20_000, help="rows per generated upload")
+    parser.add_argument("--uploads", type=int, default=4, help="distinct generated upload files")
+    parser.add_argument("--timeout", type=float, default=300, help="seconds before one interaction fails")
+    parser.add_argument("--max-p95-ms", type=float,
+                        help="exit with status 1 if any step's p95 exceeds this, or any request fails")
+    parser.add_argument("--json", help="also write the results to this JSON file")
+    args = parser.parse_args()
+
+    if not os.path.exists(APP):
+        parser.error("run from the repository root (app.py not found)")
+    sys.path.insert(0, os.getcwd())
+    share_test_runtime()
+    install_upload_hook()
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        uploads = []
+        for i in range(args.uploads):
+            path = os.path.join(tmp, f"upload_{i}.csv")
+            make_batch(args.rows, seed=i).to_csv(path, index=False)
+            uploads.append(path)
+
+        # warm the model and module caches so the first scenario is not penalised
+        simulate_user("dashboard", 1, uploads[0], args.timeout)
+        for scenario in args.scenarios:
+            results.extend(run_scenario(scenario, args.users, args.iterations, uploads, args.timeout))
+
+    table = pd.DataFrame(results)
+    print(f"{args.users} concurrent users x {args.iterations} sessions, uploads of {args.rows:,} rows")
+    print(table.drop(columns=["first_error"]).round(1).to_string(index=False))
+    for row in results:
+        if row["first_error"]:
+            print(f"\n{row['scenario']}/{row['step']} failed: {row['first_error']}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"args": vars(args), "results": results}, f, indent=2, default=float)
+
+    if args.max_p95_ms is not None:
+        failed = table[(table["p95_ms"] > args.max_p95_ms) | (table["errors"] > 0) | table["p95_ms"].isna()]
+        if len(failed):
+            print(f"\nFAILED: {len(failed)} step(s) over p95 {args.max_p95_ms:,.0f} ms or with errors")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
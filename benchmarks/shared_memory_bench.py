@@ -0,0 +1,137 @@
+"""Benchmark per-process memory and concurrent capacity, private vs shared caches.
+
+Simulates N app worker processes each serving sessions that upload one of a
+few popular batch files. In "private" mode every worker loads its own model
+and scores (and keeps) every batch, as separate `streamlit run` processes do.
+In "shared" mode workers memory-map the model and reuse scores through
+utils/shared_cache.py, as under launch_cluster.py.
+
+    python -m benchmarks.shared_memory_bench --workers 4 --rows 200000
+"""
+import argparse
+import multiprocessing as mp
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+
+def make_batch(n_rows, seed):
+    """Random customer batch with the model's input columns"""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "customerid": rng.integers(15_000_000, 16_000_000, n_rows),
+        "creditscore": rng.integers(300, 851, n_rows),
+        "geography": rng.choice(["France", "Spain", "Germany"], n_rows),
+        "gender": rng.choice(["Female", "Male"], n_rows),
+        "age": rng.integers(18, 93, n_rows),
+        "tenure": rng.integers(0, 11, n_rows),
+        "balance": np.round(rng.uniform(0, 250_000, n_rows), 2),
+        "numofproducts": rng.integers(1, 5, n_rows),
+        "hascrcard": rng.integers(0, 2, n_rows),
+        "isactivemember": rng.integers(0, 2, n_rows),
+        "estimatedsalary": np.round(rng.uniform(10, 200_000, n_rows), 2),
+    })
+
+
+def memory_kb():
+    """(RSS, PSS) of the current process in kB; PSS splits shared pages fairly"""
+    stats = {}
+    for path, key in (("/proc/self/status", "VmRSS:"), ("/proc/self/smaps_rollup", "Pss:")):
+        try:
+            with open(path) as f:
+                for line in f:
+                    if line.startswith(key):
+                        stats[key] = int(line.split()[1])
+        except OSError:
+            pass
+    return stats.get("VmRSS:", 0), stats.get("Pss:", 0)
+
+
+def worker(mode, cache_dir, batch_paths, sessions, results):
+    from utils.model_utils import load_churn_model
+    from utils.shared_cache import SHARED_CACHE_ENV, batch_key, load_shared_model, predict_churn_proba
+
+    if mode == "shared":
+        os.environ[SHARED_CACHE_ENV] = cache_dir
+        model_data = load_shared_model(cache_dir)
+    else:
+        os.environ.pop(SHARED_CACHE_ENV, None)
+        model_data = load_churn_model()
+
+    batches = [pd.read_pickle(p) for p in batch_paths]
+    kept = {}  # per-process result cache keyed by content hash, like st.cache_data
+    latencies = []
+    for i in range(sessions):
+        idx = i % len(batches)
+        start = time.perf_counter()
+        if mode == "shared":
+            probs = predict_churn_proba(model_data["pipeline"], batches[idx], model_data["model_key"])
+        else:
+            key = batch_key(batches[idx], "private")
+            if key not in kept:
+                kept[key] = model_data["pipeline"].predict_proba(batches[idx])[:, 1]
+            probs = kept[key]
+        float(np.asarray(probs).mean())
+        latencies.append(time.perf_counter() - start)
+    rss, pss = memory_kb()
+    results.put((rss, pss, latencies, len(kept)))
+
+
+def run(mode, n_workers, batch_paths, sessions, cache_dir):
+    ctx = mp.get_context("spawn")
+    results = ctx.Queue()
+    start = time.perf_counter()
+    procs = [ctx.Process(target=worker, args=(mode, cache_dir, batch_paths, sessions, results))
+             for _ in range(n_workers)]
+    for p in procs:
+        p.start()
+    out = [results.get() for _ in procs]
+    for p in procs:
+        p.join()
+    wall = time.perf_counter() - start
+    lat = np.concatenate([np.asarray(o[2]) for o in out])
+    if mode == "shared":
+        scored = len(os.listdir(os.path.join(cache_dir, "scores")))
+    else:
+        scored = sum(o[3] for o in out)
+    return {
+        "mode": mode,
+        "workers": n_workers,
+        "wall_s": wall,
+        "batches_scored": scored,
+        "sessions_per_s": len(lat) / lat.sum() * n_workers,
+        "p50_ms": np.percentile(lat, 50) * 1000,
+        "p95_ms": np.percentile(lat, 95) * 1000,
+        "rss_mb": np.mean([o[0] for o in out]) / 1024,
+        "pss_mb": np.mean([o[1] for o in out]) / 1024,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--files", type=int, default=3, help="distinct uploaded files")
+    parser.add_argument("--sessions", type=int, default=12, help="sessions per worker")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        batch_paths = []
+        for i in range(args.files):
+            path = os.path.join(tmp, f"batch_{i}.pkl")
+            make_batch(args.rows, seed=i).to_pickle(path)
+            batch_paths.append(path)
+
+        rows = []
+        for mode in ("private", "shared"):
+            cache_dir = os.path.join(tmp, f"cache_{mode}")
+            rows.append(run(mode, args.workers, batch_paths, args.sessions, cache_dir))
+
+    print(pd.DataFrame(rows).round(2).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""Benchmark target list selection: full sort vs argpartition vs streaming heap.
+
+    python -m benchmarks.targeting_bench --rows 1000000 --budget 200000
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.shared_memory_bench import make_batch
+from utils.targeting import StreamingTargets, expected_value, select_targets
+
+
+def _full_sort(df, budget):
+    ev = expected_value(df["churn_prob"].to_numpy())
+    out = df.assign(expected_value=ev).sort_values("expected_value", ascending=False)
+    return out[out["expected_value"] > 0].head(int(budget // 200))
+
+
+def _streaming(df, budget, chunk_rows=100_000):
+    targets = StreamingTargets(budget)
+    for start in range(0, len(df), chunk_rows):
+        targets.add(df.iloc[start:start + chunk_rows])
+    return targets.result()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--budget", type=float, default=200_000)
+    args = parser.parse_args()
+
+    df = make_batch(args.rows, seed=0)
+    df["churn_prob"] = np.random.default_rng(0).beta(2, 5, len(df))
+
+    rows = []
+    results = {}
+    for name, fn in [("full sort (sort_values)", _full_sort),
+                     ("argpartition top-k", select_targets),
+                     ("streaming heap, 100k chunks", _streaming)]:
+        start = time.perf_counter()
+        results[name] = fn(df, args.budget)
+        rows.append({"method": name, "seconds": time.perf_counter() - start,
+                     "selected": len(results[name])})
+
+    reference = results["full sort (sort_values)"]["expected_value"].to_numpy()
+    for row in rows:
+        row["same_value"] = np.allclose(results[row["method"]]["expected_value"].to_numpy(), reference)
+
+    print(f"{args.rows:,} rows, budget ${args.budget:,.0f}")
+    print(pd.DataFrame(rows).round(3).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
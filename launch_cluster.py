@@ -0,0 +1,134 @@
+"""Run several Streamlit app processes behind a local load balancer.
+
+Every worker memory-maps the same model dump and shares scored batches
+through CHURN_SHARED_CACHE_DIR (see utils/shared_cache.py), so adding
+workers adds concurrency without duplicating the model or the scores.
+
+    python launch_cluster.py --workers 4 --port 8501
+"""
+import argparse
+import asyncio
+import itertools
+import os
+import re
+import secrets
+import signal
+import subprocess
+import sys
+import tempfile
+
+from utils.shared_cache import SHARED_CACHE_ENV, export_shared_model
+
+# Browser sessions stay on one worker: Streamlit keeps the websocket session
+# and its uploaded files in the memory of the process that served them.
+STICKY_COOKIE = "churn_worker"
+_COOKIE_RE = re.compile(rb"^cookie:.*?\b" + STICKY_COOKIE.encode() + rb"=(\d+)", re.I | re.M)
+
+
+def start_workers(n_workers, base_port, cache_dir):
+    """Start n_workers Streamlit processes on consecutive ports"""
+    # one cookie secret for all workers so XSRF tokens validate everywhere
+    env = dict(os.environ, **{
+        SHARED_CACHE_ENV: cache_dir,
+        "STREAMLIT_SERVER_COOKIE_SECRET": secrets.token_hex(16),
+    })
+    procs = []
+    for i in range(n_workers):
+        procs.append(subprocess.Popen(
+            [sys.executable, "-m", "streamlit", "run", "app.py",
+             "--server.port", str(base_port + i),
+             "--server.address", "127.0.0.1",
+             "--server.headless", "true"],
+            env=env,
+        ))
+    return procs
+
+
+async def _pipe(reader, writer):
+    try:
+        while True:
+            data = await reader.read(65536)
+            if not data:
+                break
+            writer.write(data)
+            await writer.drain()
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        writer.close()
+
+
+async def _handle(client_reader, client_writer, ports, counter):
+    try:
+        head = await client_reader.readuntil(b"\r\n\r\n")
+    except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+        client_writer.close()
+        return
+
+    match = _COOKIE_RE.search(head)
+    worker = int(match.group(1)) if match else None
+    new_client = worker is None or worker >= len(ports)
+    if new_client:
+        worker = next(counter) % len(ports)
+
+    try:
+        backend_reader, backend_writer = await asyncio.open_connection("127.0.0.1", ports[worker])
+    except OSError:
+        client_writer.close()
+        return
+    backend_writer.write(head)
+
+    if new_client:
+        # pin the browser to this worker on its first response
+        try:
+            resp = await backend_reader.readuntil(b"\r\n\r\n")
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+            client_writer.close()
+            backend_writer.close()
+            return
+        cookie = f"Set-Cookie: {STICKY_COOKIE}={worker}; Path=/; SameSite=Lax\r\n".encode()
+        client_writer.write(resp[:-2] + cookie + b"\r\n")
+
+    await asyncio.gather(
+        _pipe(client_reader, backend_writer),
+        _pipe(backend_reader, client_writer),
+    )
+
+
+async def serve(port, ports):
+    """Accept connections on port and balance them across the worker ports"""
+    counter = itertools.count()
+    server = await asyncio.start_server(
+        lambda r, w: _handle(r, w, ports, counter), "0.0.0.0", port
+    )
+    async with server:
+        await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2)
+    parser.add_argument("--port", type=int, default=8501, help="public load balancer port")
+    parser.add_argument("--base-port", type=int, default=8601, help="first worker port")
+    parser.add_argument("--cache-dir", default=os.path.join(tempfile.gettempdir(), "churn_shared_cache"))
+    args = parser.parse_args()
+
+    # export once up front so workers only ever memory-map the dump
+    export_shared_model(args.cache_dir)
+    procs = start_workers(args.workers, args.base_port, args.cache_dir)
+    ports = [args.base_port + i for i in range(args.workers)]
+    print(f"Serving {args.workers} workers on http://localhost:{args.port} (cache: {args.cache_dir})")
+
+    try:
+        asyncio.run(serve(args.port, ports))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for proc in procs:
+            proc.send_signal(signal.SIGTERM)
+        for proc in procs:
+            proc.wait()
+
+
+if __name__ == "__main__":
+    main()
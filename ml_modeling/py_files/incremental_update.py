@@ -0,0 +1,214 @@
+"""Update the churn model from newly labeled customers without full retraining.
+
+Streams labeled rows in mini-batches from a CSV or the ``customers`` table
+and updates an SGD logistic regression with ``partial_fit``. The fitted
+preprocessor of the current artifact is kept frozen so the feature space
+does not move under the model. The first update of a LogisticRegression
+artifact warm-starts SGD from its coefficients.
+
+    python -m ml_modeling.py_files.incremental_update --csv new_outcomes.csv
+    python -m ml_modeling.py_files.incremental_update --table customers --compare
+"""
+import argparse
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.base import clone
+from sklearn.linear_model import LogisticRegression, SGDClassifier
+from sklearn.pipeline import Pipeline
+
+from ml_modeling.py_files.evaluate_model import build_report
+from ml_modeling.py_files.train_model import (
+    CATEGORICAL_COLS, LABEL_COL, NUMERIC_COLS, build_pipeline, load_training_data,
+)
+
+FEATURE_COLS = NUMERIC_COLS + CATEGORICAL_COLS
+
+
+def iter_csv_batches(path, batch_size, after_row=0):
+    """Yield lower-cased labeled batches from a CSV, skipping rows already seen"""
+    for chunk in pd.read_csv(path, chunksize=batch_size):
+        chunk.columns = [c.strip().lower() for c in chunk.columns]
+        if "rownumber" in chunk.columns:
+            chunk = chunk[chunk["rownumber"] > after_row]
+        if len(chunk):
+            yield chunk
+
+
+def iter_table_batches(table, batch_size, after_row=0):
+    """Yield labeled batches from the database, streamed with a server-side cursor"""
+    # the name is pasted into the SQL text, so only plain identifiers are accepted
+    if not table.isidentifier():
+        raise ValueError(f"invalid table name: {table!r}")
+    from sqlalchemy import text
+    from ml_modeling.db_connection import get_engine
+
+    query = text(
+        f"SELECT * FROM {table} WHERE exited IS NOT NULL AND rownumber > :after "
+        "ORDER BY rownumber"
+    )
+    with get_engine().connect().execution_options(stream_results=True) as conn:
+        for chunk in pd.read_sql_query(query, conn, params={"after": after_row}, chunksize=batch_size):
+            chunk.columns = [c.lower() for c in chunk.columns]
+            yield chunk
+
+
+def to_online_pipeline(pipeline, alpha=1e-3, eta0=1e-3):
+    """Return a pipeline whose model supports partial_fit.
+
+    SGD pipelines are returned as-is. For a LogisticRegression the fitted
+    preprocessor is reused and SGD starts from the LR coefficients, so the
+    first mini-batch refines the current model instead of starting over.
+    """
+    model = pipeline.named_steps["model"]
+    if isinstance(model, SGDClassifier):
+        return pipeline
+
+    sgd = SGDClassifier(
+        loss="log_loss", alpha=alpha, learning_rate="constant", eta0=eta0,
+        class_weight=getattr(model, "class_weight", None), random_state=42,
+    )
+    if isinstance(model, LogisticRegression):
+        # partial_fit keeps existing coef_/intercept_ on its first call
+        sgd.coef_ = model.coef_.copy()
+        sgd.intercept_ = model.intercept_.copy()
+    return Pipeline([("preprocessor", pipeline.named_steps["preprocessor"]), ("model", sgd)])
+
+
+def update(pipeline, batches):
+    """Apply partial_fit for each batch.
+
+    Each batch is scored before it is learned from (prequential evaluation),
+    which gives honest out-of-sample metrics with no separate holdout.
+
+    Returns
+    -------
+    tuple : (y_true, churn_prob, rows, last_row, seconds)
+    """
+    preprocessor = pipeline.named_steps["preprocessor"]
+    model = pipeline.named_steps["model"]
+    labels, probs = [], []
+    rows = last_row = 0
+    seconds = 0.0
+    for batch in batches:
+        start = time.perf_counter()
+        X = preprocessor.transform(batch[FEATURE_COLS])
+        y = batch[LABEL_COL].to_numpy(dtype=int)
+        if getattr(model, "coef_", None) is not None:
+            probs.append(model.predict_proba(X)[:, 1])
+            labels.append(y)
+        model.partial_fit(X, y, classes=np.array([0, 1]))
+        seconds += time.perf_counter() - start
+        rows += len(batch)
+        if "rownumber" in batch.columns:
+            last_row = max(last_row, int(batch["rownumber"].max()))
+    y_true = np.concatenate(labels) if labels else np.array([], dtype=int)
+    churn_prob = np.concatenate(probs) if probs else np.array([])
+    return y_true, churn_prob, rows, last_row, seconds
+
+
+def split_holdout(batches, fraction, train_parts, holdout_parts, seed=42):
+    """Yield each batch minus a random holdout share, collecting both parts"""
+    rng = np.random.default_rng(seed)
+    for batch in batches:
+        held = rng.random(len(batch)) < fraction
+        holdout_parts.append(batch[held])
+        train_parts.append(batch[~held])
+        yield batch[~held]
+
+
+def compare_with_retrain(artifact, online, history_path, new_rows, holdout, update_seconds):
+    """Time a full refit on history plus the new rows and compare both models on holdout.
+
+    holdout is a share of the new rows that neither the incremental update
+    nor the refit has seen.
+    """
+    X, y = load_training_data(history_path)
+    X = pd.concat([X, new_rows[FEATURE_COLS]], ignore_index=True)
+    y = pd.concat([y, new_rows[LABEL_COL].astype(int)], ignore_index=True)
+    model = artifact["pipeline"].named_steps["model"]
+    full = build_pipeline()
+    if isinstance(model, LogisticRegression):
+        full.set_params(model=clone(model))
+    start = time.perf_counter()
+    full.fit(X, y)
+    retrain_seconds = time.perf_counter() - start
+
+    y_eval = holdout[LABEL_COL].to_numpy(dtype=int)
+    rows = []
+    for name, pipe, seconds in (("incremental", online, update_seconds), ("full retrain", full, retrain_seconds)):
+        probs = pipe.predict_proba(holdout[FEATURE_COLS])[:, 1]
+        perf = build_report(y_eval, probs, artifact["threshold"], type(pipe[-1]).__name__)
+        rows.append({"mode": name, "seconds": seconds, **perf["model_performance"]["phase1"]})
+    return pd.DataFrame(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--csv", help="CSV of newly labeled customers")
+    source.add_argument("--table", help="database table, e.g. customers")
+    parser.add_argument("--model", default="models/churn_pipeline.pkl")
+    parser.add_argument("--output", help="artifact to write (default: overwrite --model)")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--after-row", type=int,
+                        help="only use rows with rownumber above this (default: last update)")
+    parser.add_argument("--alpha", type=float, default=1e-3)
+    parser.add_argument("--eta0", type=float, default=1e-3)
+    parser.add_argument("--compare", action="store_true",
+                        help="also time a full retrain on --history plus the new rows, and compare "
+                             "both on a held-out share of the new rows")
+    parser.add_argument("--history", default="ml_modeling/data/Churn_Modelling.csv")
+    parser.add_argument("--holdout", type=float, default=0.2,
+                        help="share of new rows held out for --compare")
+    args = parser.parse_args()
+
+    artifact = joblib.load(args.model)
+    after_row = args.after_row if args.after_row is not None else artifact.get("last_row", 0)
+    if args.csv:
+        batches = iter_csv_batches(args.csv, args.batch_size, after_row)
+    else:
+        batches = iter_table_batches(args.table, args.batch_size, after_row)
+
+    train_parts, holdout_parts = [], []
+    if args.compare:
+        batches = split_holdout(batches, args.holdout, train_parts, holdout_parts)
+
+    online = to_online_pipeline(artifact["pipeline"], alpha=args.alpha, eta0=args.eta0)
+    y_true, probs, n_rows, last_row, seconds = update(online, batches)
+    holdout = pd.concat(holdout_parts, ignore_index=True) if holdout_parts else None
+    if not n_rows and (holdout is None or holdout.empty):
+        print("No new labeled rows - model unchanged")
+        return
+
+    if args.compare:
+        if holdout.empty or holdout[LABEL_COL].nunique() < 2:
+            print("Holdout too small to compare (needs both classes) - skipping --compare")
+        else:
+            new_rows = pd.concat(train_parts, ignore_index=True)
+            print(compare_with_retrain(artifact, online, args.history, new_rows, holdout, seconds)
+                  .round(4).to_string(index=False))
+        if not holdout.empty:
+            # compared - now learn from the held-out rows too
+            _, _, held_rows, held_last, _ = update(online, [holdout])
+            n_rows += held_rows
+            last_row = max(last_row, held_last)
+
+    print(f"Updated on {n_rows:,} rows in {seconds:.2f}s")
+    metrics = dict(artifact["metrics"])
+    if 0 < y_true.sum() < len(y_true):
+        metrics = build_report(y_true, probs, artifact["threshold"], "SGDClassifier")["model_performance"]["phase1"]
+        print(f"Prequential metrics on the new rows: {metrics}")
+
+    joblib.dump({
+        **artifact,
+        "pipeline": online,
+        "metrics": metrics,
+        "last_row": max(last_row, after_row),
+    }, args.output or args.model)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Keep the encoded feature store current and rescore the whole customer base from it.
+
+``ingest`` encodes new and changed customers from a CSV into the store with
+the model's fitted preprocessor. ``rescore`` runs a model whose
+preprocessing matches the store over the memory-mapped matrix in chunks,
+with no CSV parsing or DataFrame building.
+
+    python -m ml_modeling.py_files.rescore_base ingest --csv data/churn_predictive_data.csv
+    python -m ml_modeling.py_files.rescore_base rescore --model models/challenger.pkl --output scores.csv
+"""
+import argparse
+import time
+
+import joblib
+import pandas as pd
+
+from utils.feature_store import CHUNK_ROWS, FeatureStore
+
+
+def ingest(store, pipeline, path, chunk_rows=CHUNK_ROWS):
+    """Upsert a customer CSV into the store chunk by chunk; returns summed counts"""
+    totals = {"added": 0, "updated": 0, "unchanged": 0}
+    for chunk in pd.read_csv(path, chunksize=chunk_rows):
+        chunk.columns = [c.strip().lower() for c in chunk.columns]
+        for key, value in store.upsert(pipeline, chunk).items():
+            totals[key] += value
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("command", choices=["ingest", "rescore"])
+    parser.add_argument("--model", default="models/churn_pipeline.pkl")
+    parser.add_argument("--store", help="feature store directory (default: .cache/feature_store)")
+    parser.add_argument("--csv", help="customer CSV to ingest")
+    parser.add_argument("--output", help="CSV of customerid, churn_prob to write on rescore")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    args = parser.parse_args()
+
+    pipeline = joblib.load(args.model)["pipeline"]
+    store = FeatureStore(args.store)
+    start = time.perf_counter()
+
+    if args.command == "ingest":
+        if not args.csv:
+            parser.error("ingest needs --csv")
+        counts = ingest(store, pipeline, args.csv, args.chunk_rows)
+        print(f"{counts['added']:,} added, {counts['updated']:,} updated, "
+              f"{counts['unchanged']:,} unchanged -> {len(store):,} customers "
+              f"({time.perf_counter() - start:.2f}s)")
+        return
+
+    ids, probs = store.score(pipeline, args.chunk_rows)
+    seconds = time.perf_counter() - start
+    print(f"Rescored {len(ids):,} customers in {seconds:.2f}s")
+    if args.output:
+        pd.DataFrame({"customerid": ids, "churn_prob": probs}).to_csv(args.output, index=False)
+        print(f"Wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
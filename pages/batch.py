@@ -4,16 +4,126 @@ import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
 import io
-from utils.file_utils import handle_file_upload
+import os
+from utils.file_utils import LABEL_COL, handle_file_upload
 from utils.kpi_calculator import calculate_kpis
+from utils.shared_cache import predict_churn_proba
+from utils.delta_index import score_with_delta
+from utils.timing import timed
+from utils.export import (
+    DEFAULT_FORMAT, EXPORT_DIR, EXPORT_FORMATS, available_formats, export_to_tempfile, remove_stale_exports,
+)
+from utils import charts
+from utils.segment_cube import SegmentCube
+from utils.data_loader import split_valid_rows
+from utils.session_store import current_session_id, session_store
+from utils.targeting import CUSTOMER_VALUE, PROMOTION_COST, select_targets, summarize_targets
 
 
 class Batch:
-    def __init__(self, model_data):
+    def __init__(self, model_data, shadow=None):
         self.pipeline = model_data["pipeline"]
         self.threshold = model_data["threshold"]
+        # only present when the model was loaded from the shared cache
+        self.model_key = model_data.get("model_key")
+        # utils.shadow.ShadowScorer when a challenger model is configured
+        self.shadow = shadow
         # self.pipeline, self.threshold, _, _ = model_data
 
+    def _render_export(self, df, filename):
+        """Build the results file only when asked, streaming it to disk in chunks"""
+        col_fmt, col_btn = st.columns([3, 1])
+        formats = available_formats()
+        fmt = col_fmt.selectbox("Export format", formats, index=formats.index(DEFAULT_FORMAT),
+                                key="export_format",
+                                help="The file is held in memory while it downloads; compressed formats are much smaller")
+        export_key = (filename, fmt, len(df), float(df['churn_prob'].sum()))
+
+        prev = st.session_state.get('export')
+        if prev is not None and prev['key'] != export_key:
+            # results or format changed - the old file is stale
+            self._drop_export()
+            prev = None
+
+        if col_btn.button("Prepare download", use_container_width=True):
+            self._drop_export()
+            remove_stale_exports()
+            with timed("export", rows=len(df)), st.spinner("Writing results file..."):
+                path, mime = export_to_tempfile(df, fmt, directory=EXPORT_DIR)
+            prev = st.session_state['export'] = {'key': export_key, 'path': path, 'mime': mime}
+
+        if prev is not None and os.path.exists(prev['path']):
+            ext = EXPORT_FORMATS[fmt][0]
+            with open(prev['path'], 'rb') as f:
+                st.download_button("Download", f, f"{filename}_results{ext}", mime=prev['mime'])
+
+    @staticmethod
+    def _drop_export():
+        """Delete this session's prepared export file, if any"""
+        prev = st.session_state.pop('export', None)
+        if prev is not None and os.path.exists(prev['path']):
+            os.remove(prev['path'])
+
+    def _render_targeting(self, df, filename, customer_value, promotion_cost):
+        """Best customers to contact for a fixed campaign budget"""
+        st.subheader('Retention Target List')
+        budget = st.number_input("Campaign budget ($)", min_value=0, value=20_000, step=1_000)
+
+        with timed("targeting", rows=len(df)):
+            targets = select_targets(df, budget, customer_value, promotion_cost)
+            summary = summarize_targets(targets, budget, promotion_cost)
+
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("Customers to contact", f"{summary['contacted']:,}")
+        col2.metric("Spend", f"${summary['spend']:,.0f}")
+        col3.metric("Expected saves", f"{summary['expected_saves']:,.1f}")
+        col4.metric("Expected value", f"${summary['expected_value']:,.0f}")
+        if summary['unused_budget'] >= promotion_cost:
+            st.caption("Every customer with a positive expected value is already on the list; "
+                       "the rest of the budget would lose money.")
+
+        st.dataframe(targets, use_container_width=True)
+        st.download_button("Download target list", targets.to_csv(index=False).encode(),
+                           f"{filename}_targets.csv", mime="text/csv")
+
+    def _render_interactive(self, df, churn_col, cube):
+        """Plotly charts drawn from NumPy aggregates; only bins and a capped
+        sample of points reach the browser, whatever the upload size"""
+        figs = []
+        if churn_col is not None:
+            flags = df[churn_col].to_numpy()
+            with timed("plot:churn_split"):
+                figs.append(charts.churn_split_figure(flags))
+            with timed("plot:score_distribution"):
+                figs.append(charts.score_distribution_figure(df['churn_prob'], self.threshold))
+            if 'age' in df.columns:
+                with timed("plot:churn_by_age_group"):
+                    figs.append(charts.group_rate_figure(
+                        cube.rollup('age_band').drop('Unknown'),
+                        'Churn Rate by Age Group (%)', 'Age Group', color='steelblue'))
+            if 'balance' in df.columns:
+                with timed("plot:churn_by_balance_group"):
+                    figs.append(charts.group_rate_figure(
+                        cube.rollup('balance_band').drop('Unknown'),
+                        'Churn Rate by Balance Group (%)', 'Balance Group', color='indianred'))
+        if 'age' in df.columns and 'balance' in df.columns:
+            with timed("plot:age_balance_scatter"):
+                figs.append(charts.scatter_figure(df['age'], df['balance'], df['churn_prob'], 'age', 'balance'))
+
+        numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
+        numeric_cols = [c for c in numeric_cols if c not in ['churn_prob', 'prediction']]
+        if numeric_cols:
+            sel = st.multiselect('Select numeric columns to visualize', numeric_cols, default=numeric_cols[:4])
+            for col in sel:
+                with timed(f"plot:dist_{col}"):
+                    figs.append(charts.histogram_figure(df[col], col))
+
+        for i in range(0, len(figs), 2):
+            cols = st.columns(2)
+            for j, fig in enumerate(figs[i:i + 2]):
+                with cols[j], timed(f"render:plotly_{i + j}"):
+                    st.plotly_chart(fig, use_container_width=True, key=f"plotly_{i + j}")
+
     def render(self):
         
                 # Instruction section with shadow
@@ -148,26 +258,95 @@ class Batch:
             )
 
         if df is not None:
+            # Bad rows go to quarantine instead of failing the whole file
+            with timed("validation", rows=len(df)):
+                df, quarantine = split_valid_rows(df)
+            if len(quarantine):
+                st.warning(f"{len(quarantine):,} rows failed validation and were not scored.")
+                with st.expander("Quarantined rows"):
+                    st.dataframe(quarantine['reason'].value_counts().rename('rows'), use_container_width=True)
+                    st.dataframe(quarantine.head(1000), use_container_width=True)
+                    st.download_button("Download quarantined rows", quarantine.to_csv(index=False).encode(),
+                                       f"{filename}_quarantine.csv", mime="text/csv")
+            if df.empty:
+                st.error("No valid rows left to score.")
+                return
+
+            # Known outcomes are not a model input; they only feed the shadow log
+            labels = df.pop(LABEL_COL) if LABEL_COL in df.columns else None
+
+            with st.sidebar:
+                delta_mode = st.checkbox(
+                    "Delta mode (only score new/changed customers)",
+                    help="Reuse scores from earlier uploads for customers whose data has not changed",
+                )
+
+            delta_stats = None
             try:
-                probs = self.pipeline.predict_proba(df)[:, 1]
+                with timed("scoring", rows=len(df)):
+                    if delta_mode and 'customerid' in df.columns:
+                        probs, delta_stats = score_with_delta(self.pipeline, df, self.model_key)
+                        if self.shadow is not None:
+                            self.shadow.score(df, probs, labels=labels)
+                    elif self.shadow is not None and self.model_key is None:
+                        # shares the transformed features with the challenger
+                        probs = self.shadow.score(df, labels=labels)
+                    else:
+                        probs = predict_churn_proba(self.pipeline, df, self.model_key)
+                        if self.shadow is not None:
+                            self.shadow.score(df, probs, labels=labels)
             except (KeyError, ValueError):
                 _show_no_features_popup()
                 return  # stop rendering – nothing more to show
 
+            if delta_stats is not None:
+                st.info(
+                    f"Delta mode: {delta_stats['new']:,} new, {delta_stats['changed']:,} changed, "
+                    f"{delta_stats['unchanged']:,} unchanged customers. Skipped scoring "
+                    f"{delta_stats['unchanged']:,} rows (~{delta_stats['saved_seconds']:.2f}s saved, "
+                    f"{delta_stats['score_seconds']:.2f}s spent scoring)."
+                )
+            elif delta_mode:
+                st.warning("Delta mode needs a customerid column - scored all rows.")
+
             preds = (probs > self.threshold).astype(int)
             df['churn_prob'] = list(probs)
             df['prediction'] = preds
-            # Save to session for other pages if desired
-            st.session_state['pred_df'] = df
+            # Kept in the session store rather than session_state, so idle
+            # sessions' batches can be spilled to disk under memory pressure
+            session_store().put(current_session_id(), 'pred_df', df, filename=filename)
+
+        elif upload_error is None:
+            # The uploader forgets its file when the user visits another page;
+            # show the last scored batch of this session instead
+            stored = session_store().get(current_session_id(), 'pred_df')
+            if stored is not None:
+                df, meta = stored
+                filename = meta['filename']
+                st.info(f"Showing results for {filename} from earlier in this session. "
+                        "Upload a file to score a new batch.")
+
+        if df is not None:
+            # One pass over the scored rows; segment charts and the Insights
+            # page read their group rates from this cube
+            with timed("segment_cube", rows=len(df)):
+                cube = SegmentCube.from_frame(df)
+            st.session_state['segment_cube'] = cube
 
             # Sidebar filter
             with st.sidebar:
                 min_prob = st.slider("Show High Risk >", 0.0, 1.0, 0.3)
                 df_filtered = df[df['churn_prob'] > min_prob]
+                # Shared by the KPI row and the target list
+                customer_value = st.number_input("Value of a retained churner ($)", min_value=0,
+                                                 value=CUSTOMER_VALUE, step=100)
+                promotion_cost = st.number_input("Cost per offer ($)", min_value=1,
+                                                 value=PROMOTION_COST, step=10)
 
             # KPIs
-            kpis = calculate_kpis(df, df_filtered['prediction'])
-            kpis2 = calculate_kpis(df_filtered, df_filtered['prediction'])
+            with timed("kpis", rows=len(df)):
+                kpis = calculate_kpis(df, df_filtered['prediction'], customer_value, promotion_cost)
+                kpis2 = calculate_kpis(df_filtered, df_filtered['prediction'], customer_value, promotion_cost)
             
             col1, col2, col3, col4, col5 = st.columns(5)
             col2.metric("Total customers in table", len(df))
@@ -181,7 +360,8 @@ class Batch:
             # Display all columns with prediction and probability at the end, excluding churn_prob from middle
             display_cols = [col for col in df_filtered.columns if col not in ['prediction', 'churn_prob']] + ['churn_prob', 'prediction']
             st.dataframe(df_filtered[display_cols], use_container_width=True)
-            st.download_button("Download", df.to_csv(index=False).encode(), f"{filename}_results.csv")
+            self._render_export(df, filename)
+            self._render_targeting(df, filename, customer_value, promotion_cost)
 
             # VISUALS: show plots derived from the predicted file in a compact two-column grid
             st.header('Visualizations from Predicted File')
@@ -194,64 +374,62 @@ class Batch:
             else:
                 churn_col = None
 
+            with st.sidebar:
+                chart_mode = st.radio(
+                    "Chart mode", ["Static", "Interactive"], horizontal=True,
+                    help="Interactive charts are aggregated on the server, so they stay fast for large uploads",
+                )
+            if chart_mode == "Interactive":
+                self._render_interactive(df, churn_col, cube)
+                return
+
             # plots holds (figure, title) tuples
             plots = []
 
             # churn count
             if churn_col is not None:
-                churn_counts = df[churn_col].value_counts().reindex([0, 1], fill_value=0)
-                fig_count, ax_count = plt.subplots(figsize=(5, 3))
-                sns.countplot(x=churn_col, data=df, ax=ax_count, palette='Set2')
-                ax_count.set_title('Customer Churn Distribution')
-                ax_count.set_xlabel('Churn Status')
-                ax_count.set_ylabel('Number of Customers')
-                ax_count.tick_params(axis='x', rotation=45)
-                for p in ax_count.patches:
-                    ax_count.annotate(f'{int(p.get_height()):,}', (p.get_x() + p.get_width() / 2., p.get_height()), ha='center', va='bottom', fontsize=9)
-                fig_count.tight_layout()
-                plots.append((fig_count, 'churn_distribution'))
+                with timed("plot:churn_distribution"):
+                    churn_counts = df[churn_col].value_counts().reindex([0, 1], fill_value=0)
+                    fig_count, ax_count = plt.subplots(figsize=(5, 3))
+                    sns.countplot(x=churn_col, data=df, ax=ax_count, palette='Set2')
+                    ax_count.set_title('Customer Churn Distribution')
+                    ax_count.set_xlabel('Churn Status')
+                    ax_count.set_ylabel('Number of Customers')
+                    ax_count.tick_params(axis='x', rotation=45)
+                    for p in ax_count.patches:
+                        ax_count.annotate(f'{int(p.get_height()):,}', (p.get_x() + p.get_width() / 2., p.get_height()), ha='center', va='bottom', fontsize=9)
+                    fig_count.tight_layout()
+                    plots.append((fig_count, 'churn_distribution'))
 
                 # churn pie
-                fig_pie, ax_pie = plt.subplots(figsize=(5, 3))
-                labels = ['Retained', 'Churned']
-                sizes = [churn_counts.get(0, 0), churn_counts.get(1, 0)]
-                ax_pie.pie(sizes, labels=labels, autopct='%1.1f%%', startangle=90, colors=['lightgreen', 'lightcoral'], explode=(0, 0.05), textprops={'fontsize': 9})
-                ax_pie.set_title('Churn Rate Percentage')
-                fig_pie.tight_layout()
-                plots.append((fig_pie, 'churn_rate_pie'))
+                with timed("plot:churn_rate_pie"):
+                    fig_pie, ax_pie = plt.subplots(figsize=(5, 3))
+                    labels = ['Retained', 'Churned']
+                    sizes = [churn_counts.get(0, 0), churn_counts.get(1, 0)]
+                    ax_pie.pie(sizes, labels=labels, autopct='%1.1f%%', startangle=90, colors=['lightgreen', 'lightcoral'], explode=(0, 0.05), textprops={'fontsize': 9})
+                    ax_pie.set_title('Churn Rate Percentage')
+                    fig_pie.tight_layout()
+                    plots.append((fig_pie, 'churn_rate_pie'))
 
             # churn by age groups
             if 'age' in df.columns and churn_col is not None:
-                bins = [0, 20, 30, 40, 50, 60, 70, 100]
-                labels = ['0-20', '21-30', '31-40', '41-50', '51-60', '61-70', '71+']
-                df['Age_Group'] = pd.cut(df['age'], bins=bins, labels=labels, right=True)
-                age_churn = df.groupby('Age_Group')[churn_col].mean() * 100
-                fig_age, ax_age = plt.subplots(figsize=(5, 3))
-                age_churn.plot(kind='bar', color='steelblue', ax=ax_age)
-                ax_age.set_title('Churn Rate by Age Group (%)')
-                ax_age.set_xlabel('Age Group')
-                ax_age.set_ylabel('Churn Rate (%)')
-                ax_age.tick_params(axis='x', rotation=45)
-                for p in ax_age.patches:
-                    ax_age.annotate(f'{p.get_height():.1f}%', (p.get_x() + p.get_width() / 2., p.get_height()), ha='center', va='bottom', fontsize=9)
-                fig_age.tight_layout()
-                plots.append((fig_age, 'churn_by_age_group'))
+                with timed("plot:churn_by_age_group"):
+                    age_churn = cube.rollup('age_band')['churn_rate'].drop('Unknown') * 100
+                    fig_age, ax_age = plt.subplots(figsize=(5, 3))
+                    age_churn.plot(kind='bar', color='steelblue', ax=ax_age)
+                    ax_age.set_title('Churn Rate by Age Group (%)')
+                    ax_age.set_xlabel('Age Group')
+                    ax_age.set_ylabel('Churn Rate (%)')
+                    ax_age.tick_params(axis='x', rotation=45)
+                    for p in ax_age.patches:
+                        ax_age.annotate(f'{p.get_height():.1f}%', (p.get_x() + p.get_width() / 2., p.get_height()), ha='center', va='bottom', fontsize=9)
+                    fig_age.tight_layout()
+                    plots.append((fig_age, 'churn_by_age_group'))
 
             # churn by balance (binned)
-            balance_col = None
-            if 'balance' in df.columns:
-                balance_col = 'balance'
-            elif 'Balance' in df.columns:
-                balance_col = 'Balance'
-
-            if balance_col is not None and churn_col is not None:
-                # create sensible bins based on distribution
-                max_bal = int(df[balance_col].max(skipna=True) if pd.api.types.is_numeric_dtype(df[balance_col]) else 0)
-                bins = [0, 5000, 15000, 30000, 60000, 100000, max_bal + 1]
-                labels = ['0-5k', '5k-15k', '15k-30k', '30k-60k', '60k-100k', '100k+']
-                try:
-                    df['Balance_Group'] = pd.cut(df[balance_col], bins=bins, labels=labels, include_lowest=True)
-                    bal_churn = df.groupby('Balance_Group')[churn_col].mean() * 100
+            if 'balance' in df.columns and churn_col is not None:
+                with timed("plot:churn_by_balance_group"):
+                    bal_churn = cube.rollup('balance_band')['churn_rate'].drop('Unknown') * 100
                     fig_bal, ax_bal = plt.subplots(figsize=(5, 3))
                     bal_churn.plot(kind='bar', color='indianred', ax=ax_bal)
                     ax_bal.set_title('Churn Rate by Balance Group (%)')
@@ -262,55 +440,50 @@ class Batch:
                         ax_bal.annotate(f'{p.get_height():.1f}%', (p.get_x() + p.get_width() / 2., p.get_height()), ha='center', va='bottom', fontsize=9)
                     fig_bal.tight_layout()
                     plots.append((fig_bal, 'churn_by_balance_group'))
-                except Exception:
-                    # if binning fails, skip gracefully
-                    pass
             # churn by balance groups
             if 'balance' in df.columns and churn_col is not None:
-                # Create balance quartile groups safely (handle duplicate edges)
-                try:
-                    bal_q = pd.qcut(df['balance'], q=4, duplicates='drop')
-                    # build labels based on number of bins returned
-                    cats = list(bal_q.cat.categories)
-                    labels = []
-                    for i in range(len(cats)):
-                        if i == 0:
-                            labels.append(f'Q{i+1} (Low)')
-                        elif i == len(cats) - 1:
-                            labels.append(f'Q{i+1} (High)')
-                        else:
-                            labels.append(f'Q{i+1}')
-                    # map category intervals to labels
-                    mapping = {cat: lbl for cat, lbl in zip(cats, labels)}
-                    df['Balance_Quartile'] = bal_q.map(mapping)
-                    # ensure categorical order
-                    df['Balance_Quartile'] = pd.Categorical(df['Balance_Quartile'], categories=labels, ordered=True)
-                except Exception:
-                    # fallback: equal-width bins
+                with timed("plot:churn_by_balance_quartile"):
+                    # Balance quartile groups, computed per render rather than stored on the frame
+                    # (handle duplicate edges)
                     try:
-                        max_bal = float(df['balance'].max(skipna=True))
-                        bins = [0, max_bal*0.25, max_bal*0.5, max_bal*0.75, max_bal]
-                        df['Balance_Quartile'] = pd.cut(df['balance'], bins=bins, include_lowest=True)
-                        df['Balance_Quartile'] = df['Balance_Quartile'].astype(str)
+                        bal_q = pd.qcut(df['balance'], q=4, duplicates='drop')
+                        # build labels based on number of bins returned
+                        cats = list(bal_q.cat.categories)
+                        labels = []
+                        for i in range(len(cats)):
+                            if i == 0:
+                                labels.append(f'Q{i+1} (Low)')
+                            elif i == len(cats) - 1:
+                                labels.append(f'Q{i+1} (High)')
+                            else:
+                                labels.append(f'Q{i+1}')
+                        # map category intervals to labels, keeping their order
+                        quartile = bal_q.cat.rename_categories(labels).cat.as_ordered()
                     except Exception:
-                        df['Balance_Quartile'] = 'Unknown'
+                        # fallback: equal-width bins
+                        try:
+                            max_bal = float(df['balance'].max(skipna=True))
+                            bins = [0, max_bal*0.25, max_bal*0.5, max_bal*0.75, max_bal]
+                            quartile = pd.cut(df['balance'], bins=bins, include_lowest=True).astype(str)
+                        except Exception:
+                            quartile = pd.Series('Unknown', index=df.index)
 
-                balance_churn = df.groupby('Balance_Quartile')[churn_col].mean() * 100
+                    balance_churn = df[churn_col].groupby(quartile, observed=False).mean() * 100
 
-                fig_balance, ax_balance = plt.subplots(figsize=(5, 3))
-                bars = ax_balance.bar(balance_churn.index.astype(str), balance_churn.values,
-                                     color=['skyblue'] * len(balance_churn))
-                ax_balance.set_title('Churn Rate by Balance Quartile (%)')
-                ax_balance.set_xlabel('Balance Quartile')
-                ax_balance.set_ylabel('Churn Rate (%)')
-                ax_balance.tick_params(axis='x', rotation=45)
+                    fig_balance, ax_balance = plt.subplots(figsize=(5, 3))
+                    bars = ax_balance.bar(balance_churn.index.astype(str), balance_churn.values,
+                                         color=['skyblue'] * len(balance_churn))
+                    ax_balance.set_title('Churn Rate by Balance Quartile (%)')
+                    ax_balance.set_xlabel('Balance Quartile')
+                    ax_balance.set_ylabel('Churn Rate (%)')
+                    ax_balance.tick_params(axis='x', rotation=45)
 
-                for bar, rate in zip(bars, balance_churn.values):
-                    ax_balance.annotate(f'{rate:.1f}%',
-                                        (bar.get_x() + bar.get_width() / 2, bar.get_height()),
-                                        ha='center', va='bottom', fontsize=9)
-                fig_balance.tight_layout()
-                plots.append((fig_balance, 'churn_by_balance_quartile'))
+                    for bar, rate in zip(bars, balance_churn.values):
+                        ax_balance.annotate(f'{rate:.1f}%',
+                                            (bar.get_x() + bar.get_width() / 2, bar.get_height()),
+                                            ha='center', va='bottom', fontsize=9)
+                    fig_balance.tight_layout()
+                    plots.append((fig_balance, 'churn_by_balance_quartile'))
 
             # Numeric distributions
             numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
@@ -319,12 +492,13 @@ class Batch:
                 st.subheader('Numeric Feature Distributions')
                 sel = st.multiselect('Select numeric columns to visualize', numeric_cols, default=numeric_cols[:4])
                 for col in sel:
-                    fig_hist, ax_hist = plt.subplots(figsize=(5, 3))
-                    sns.histplot(df[col].dropna(), kde=True, ax=ax_hist)
-                    ax_hist.set_title(f'Distribution of {col}')
-                    ax_hist.tick_params(axis='x', rotation=45)
-                    fig_hist.tight_layout()
-                    plots.append((fig_hist, f'dist_{col}'))
+                    with timed(f"plot:dist_{col}"):
+                        fig_hist, ax_hist = plt.subplots(figsize=(5, 3))
+                        sns.histplot(df[col].dropna(), kde=True, ax=ax_hist)
+                        ax_hist.set_title(f'Distribution of {col}')
+                        ax_hist.tick_params(axis='x', rotation=45)
+                        fig_hist.tight_layout()
+                        plots.append((fig_hist, f'dist_{col}'))
 
             # Render plots in a two-column grid with individual download buttons
             def fig_to_png(fig):
@@ -337,22 +511,24 @@ class Batch:
                 cols = st.columns(2)
                 with cols[0]:
                     fig0, name0 = plots[i]
-                    st.pyplot(fig0)
-                    st.download_button(
-                        label=f"⬇ Download",
-                        data=fig_to_png(fig0),
-                        file_name=f"{name0}.png",
-                        mime="image/png",
-                        key=f"dl_{i}"
-                    )
-                if i + 1 < len(plots):
-                    with cols[1]:
-                        fig1, name1 = plots[i + 1]
-                        st.pyplot(fig1)
+                    with timed(f"render:{name0}"):
+                        st.pyplot(fig0)
                         st.download_button(
                             label=f"⬇ Download",
-                            data=fig_to_png(fig1),
-                            file_name=f"{name1}.png",
+                            data=fig_to_png(fig0),
+                            file_name=f"{name0}.png",
                             mime="image/png",
-                            key=f"dl_{i+1}"
+                            key=f"dl_{i}"
                         )
+                if i + 1 < len(plots):
+                    with cols[1]:
+                        fig1, name1 = plots[i + 1]
+                        with timed(f"render:{name1}"):
+                            st.pyplot(fig1)
+                            st.download_button(
+                                label=f"⬇ Download",
+                                data=fig_to_png(fig1),
+                                file_name=f"{name1}.png",
+                                mime="image/png",
+                                key=f"dl_{i+1}"
+                            )
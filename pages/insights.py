@@ -1,5 +1,6 @@
 import streamlit as st
 import pandas as pd
+from utils.segment_cube import DIMENSIONS
 
 
 class Insights:
@@ -69,3 +70,41 @@ class Insights:
             - **Threshold {best_row['threshold']}** provides the optimal financial trade-off
             """
         )
+
+        self._render_segments()
+
+    def _render_segments(self):
+        st.divider()
+        st.markdown("## Segment Breakdown")
+
+        # Built by the Mass Prediction page from the last scored upload
+        cube = st.session_state.get("segment_cube")
+        if cube is None or cube.total == 0:
+            st.info("Run a Mass Prediction to see churn by geography, gender, age, balance and product count.")
+            return
+
+        dims = list(DIMENSIONS)
+        pretty = lambda d: d.replace("_", " ").title()
+        c1, c2, c3 = st.columns(3)
+        first = c1.selectbox("Break down by", dims, format_func=pretty)
+        second = c2.selectbox("Then by", ["(none)"] + [d for d in dims if d != first],
+                              format_func=lambda d: d if d == "(none)" else pretty(d))
+        geos = c3.multiselect("Geography filter", DIMENSIONS["geography"][:-1])
+
+        filters = {"geography": geos} if geos else {}
+        group = (first,) if second == "(none)" else (first, second)
+        table = cube.rollup(*group, **filters)
+        table = table[table["customers"] > 0]
+
+        if second == "(none)":
+            st.dataframe(
+                table.style.format({"churn_rate": "{:.1%}", "mean_prob": "{:.1%}"}),
+                use_container_width=True
+            )
+        else:
+            st.markdown("**Predicted churn rate**")
+            st.dataframe(
+                table["churn_rate"].unstack().style.format("{:.1%}", na_rep="-"),
+                use_container_width=True
+            )
+        st.caption(f"{int(table['customers'].sum()):,} customers from the last Mass Prediction run")
@@ -1,8 +1,33 @@
 import streamlit as st
+from utils.shadow import shadow_history
 
 class Metrics:
-    def __init__(self, model_data):
+    def __init__(self, model_data, shadow=None):
         self.metrics = model_data["metrics"]
+        self.shadow = shadow
+
+    def _render_shadow(self):
+        """Champion vs challenger statistics logged by shadow scoring"""
+        st.markdown("## Champion vs Challenger")
+        history = shadow_history()
+        if history.empty:
+            st.info("No shadow-scored batches yet. Score a file on the Mass Prediction page.")
+            return
+
+        weights = history["rows"]
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("Batches", f"{len(history):,}")
+        col2.metric("Rows", f"{int(weights.sum()):,}")
+        col3.metric("Decision agreement", f"{(history['agreement'] * weights).sum() / weights.sum():.1%}")
+        col4.metric("Top-decile overlap", f"{(history['top_decile_overlap'] * weights).sum() / weights.sum():.1%}")
+
+        trend = history.set_index("time")[["agreement", "top_decile_overlap", "rank_corr"]]
+        st.line_chart(trend)
+        lift_cols = [c for c in ("champion_lift", "challenger_lift") if c in history.columns]
+        if lift_cols:
+            st.caption("Top-decile lift, for batches that included actual outcomes")
+            st.line_chart(history.set_index("time")[lift_cols].dropna())
+        st.dataframe(history.iloc[::-1], use_container_width=True, hide_index=True)
 
     def _card(self, label, value):
         st.markdown(
@@ -62,3 +87,6 @@ class Metrics:
 
         st.markdown("<br>", unsafe_allow_html=True)
         st.success("Pipeline loaded — Ready for predictions")
+
+        if self.shadow is not None:
+            self._render_shadow()
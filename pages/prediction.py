@@ -1,10 +1,23 @@
+import joblib
 import streamlit as st
 from utils.data_loader import validate_customer_data
+from utils.timing import timed
+from utils.whatif import WHATIF_FEATURES, hold_others, score_grid, sensitivity, whatif_axes
+from utils import charts
+
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def _scored_grid(_pipeline, model_key, customer, features, steps):
+    """What-if grid for one customer; reruns that only change the chart view reuse it"""
+    return score_grid(_pipeline, customer, whatif_axes(customer, list(features), steps))
+
 
 class Prediction:
     def __init__(self, model_data):
         self.pipeline = model_data["pipeline"]
         self.threshold = model_data["threshold"]
+        # only present when the model was loaded from the shared cache
+        self.model_key = model_data.get("model_key") or joblib.hash(self.pipeline)
         # self.pipeline, self.threshold, _, _ = model_data
         
     
@@ -32,13 +45,15 @@ class Prediction:
         with col2: gender = st.selectbox("Gender", ['Female', 'Male'])
         with col3: active = st.selectbox("Active", [1, 0])
         
+        customer = {
+            'creditscore': creditscore, 'geography': geo, 'gender': gender,
+            'age': age, 'tenure': tenure, 'balance': balance,
+            'numofproducts': products, 'hascrcard': 1, 'isactivemember': active,
+            'estimatedsalary': salary
+        }
+
         if st.button("Predict", type="primary", use_container_width=True):
-            data = validate_customer_data({
-                'creditscore': creditscore, 'geography': geo, 'gender': gender,
-                'age': age, 'tenure': tenure, 'balance': balance,
-                'numofproducts': products, 'hascrcard': 1, 'isactivemember': active,
-                'estimatedsalary': salary
-            })
+            data = validate_customer_data(customer)
             
             prob = self.pipeline.predict_proba(data)[0, 1]
             pred = 1 if prob > self.threshold else 0
@@ -56,4 +71,33 @@ class Prediction:
                 )
 
             # Probability metric shown alongside the banner
-            st.metric("Churn Probability", f"{prob:.1%}")
\ No newline at end of file
+            st.metric("Churn Probability", f"{prob:.1%}")
+
+        st.divider()
+        if st.toggle("What-if mode", help="Score variations of this customer to see what would change the risk"):
+            self._render_whatif(customer)
+
+    def _render_whatif(self, customer):
+        """Score every combination of the chosen features in one predict_proba call"""
+        features = st.multiselect("Vary", list(WHATIF_FEATURES), default=list(WHATIF_FEATURES))
+        if not features:
+            st.info("Choose at least one feature to vary.")
+            return
+        steps = st.slider("Balance steps", 10, 500, 100) if 'balance' in features else 100
+
+        axes = whatif_axes(customer, features, steps)
+        with timed("whatif_scoring"):
+            grid = _scored_grid(self.pipeline, self.model_key, customer, tuple(features), steps)
+        st.caption(f"Scored {len(grid):,} variations in one call.")
+
+        current = hold_others(grid, customer, [])['churn_prob'].iloc[0]
+        st.plotly_chart(charts.sensitivity_figure(sensitivity(grid, customer, axes), current),
+                        use_container_width=True)
+
+        col1, col2 = st.columns(2)
+        x = col1.selectbox("X axis", features)
+        line = col2.selectbox("One line per", [None] + [f for f in features if f != x and f != 'balance'],
+                              format_func=lambda f: "-" if f is None else f)
+        lines = hold_others(grid, customer, [x, line])
+        st.plotly_chart(charts.whatif_lines_figure(lines, x, line, self.threshold), use_container_width=True)
+        st.caption("Features not on the chart are held at this customer's current values.")
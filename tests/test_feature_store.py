@@ -0,0 +1,34 @@
+import numpy as np
+import pandas as pd
+
+from benchmarks.shared_memory_bench import make_batch
+from ml_modeling.py_files.train_model import build_pipeline
+from utils.feature_store import FeatureStore
+
+
+def _customers(ids, seed):
+    df = make_batch(len(ids), seed)
+    df["customerid"] = ids
+    return df
+
+
+def test_upsert_grows_store_and_scores_merged_rows(tmp_path):
+    train = make_batch(2_000, seed=0)
+    labels = (train["age"] > 45).astype(int)
+    pipeline = build_pipeline().fit(train, labels)
+
+    store = FeatureStore(str(tmp_path))
+    first = _customers(np.arange(500), seed=1)
+    assert store.upsert(pipeline, first) == {"added": 500, "updated": 0, "unchanged": 0}
+
+    # past the first allocation's capacity, so the matrix must grow
+    second = _customers(np.arange(250, 2_250), seed=2)
+    counts = store.upsert(pipeline, second)
+    assert counts == {"added": 1_750, "updated": 250, "unchanged": 0}
+    assert len(store) == 2_250
+
+    merged = pd.concat([first, second]).drop_duplicates("customerid", keep="last").set_index("customerid")
+    for reopened in (store, FeatureStore(str(tmp_path))):
+        ids, probs = reopened.score(pipeline)
+        expected = pipeline.predict_proba(merged.loc[ids].reset_index())[:, 1]
+        np.testing.assert_allclose(probs, expected)
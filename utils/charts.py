@@ -0,0 +1,118 @@
+# Server-side aggregation and Plotly figures for the interactive chart mode
+import numpy as np
+import plotly.graph_objects as go
+
+# Same groupings as the static charts on the Mass Prediction page
+AGE_BINS = [0, 20, 30, 40, 50, 60, 70, 100]
+AGE_LABELS = ['0-20', '21-30', '31-40', '41-50', '51-60', '61-70', '71+']
+BALANCE_BINS = [0, 5000, 15000, 30000, 60000, 100000, np.inf]
+BALANCE_LABELS = ['0-5k', '5k-15k', '15k-30k', '30k-60k', '60k-100k', '100k+']
+
+# Row-level views never send more points than this to the browser
+MAX_POINTS = 5000
+
+
+def bin_index(values, edges, include_lowest=False):
+    """Right-closed bin per value like pd.cut(right=True); -1 when out of range"""
+    values = np.asarray(values, dtype=float)
+    idx = np.searchsorted(edges, values, side="left") - 1
+    if include_lowest:
+        idx[values == edges[0]] = 0
+    idx[(idx < 0) | (idx >= len(edges) - 1) | np.isnan(values)] = -1
+    return idx
+
+
+def histogram(values, bins=40):
+    """(counts, edges) for the finite values"""
+    values = np.asarray(values, dtype=float)
+    return np.histogram(values[np.isfinite(values)], bins=bins)
+
+
+def downsample(n_rows, max_points=MAX_POINTS, seed=0):
+    """Row positions to plot: all of them, or a uniform random sample"""
+    if n_rows <= max_points:
+        return np.arange(n_rows)
+    return np.sort(np.random.default_rng(seed).choice(n_rows, max_points, replace=False))
+
+
+def _layout(fig, title, x_title, y_title):
+    fig.update_layout(title=title, xaxis_title=x_title, yaxis_title=y_title,
+                      height=320, margin=dict(l=10, r=10, t=40, b=10))
+    return fig
+
+
+def churn_split_figure(flags):
+    counts = np.bincount(np.asarray(flags, dtype=int), minlength=2)[:2]
+    fig = go.Figure(go.Pie(labels=['Retained', 'Churned'], values=counts, hole=0.4,
+                           marker_colors=['lightgreen', 'lightcoral']))
+    fig.update_layout(title='Churn Split', height=320, margin=dict(l=10, r=10, t=40, b=10))
+    return fig
+
+
+def group_rate_figure(segments, title, x_title, color=None):
+    """Churn rate bars from a SegmentCube rollup (customers, churners, churn_rate)"""
+    rate = segments['churn_rate'].to_numpy(dtype=float) * 100
+    fig = go.Figure(go.Bar(
+        x=segments.index.astype(str), y=rate, marker_color=color,
+        customdata=segments[['customers', 'churners']].to_numpy(),
+        text=[f'{r:.1f}%' if np.isfinite(r) else '' for r in rate], textposition='outside',
+        hovertemplate='%{x}<br>Churn rate %{y:.1f}%<br>%{customdata[1]:,.0f} of %{customdata[0]:,.0f}<extra></extra>',
+    ))
+    return _layout(fig, title, x_title, 'Churn Rate (%)')
+
+
+def score_distribution_figure(probs, threshold, bins=50):
+    counts, edges = np.histogram(np.asarray(probs, dtype=float), bins=bins, range=(0, 1))
+    centers = (edges[:-1] + edges[1:]) / 2
+    fig = go.Figure(go.Bar(x=centers, y=counts, width=edges[1] - edges[0],
+                           marker_color=np.where(centers > threshold, 'indianred', 'steelblue')))
+    fig.add_vline(x=threshold, line_dash='dash', annotation_text=f'threshold {threshold:.2f}')
+    return _layout(fig, 'Churn Probability Distribution', 'Churn probability', 'Customers')
+
+
+def histogram_figure(values, name, bins=40):
+    counts, edges = histogram(values, bins)
+    centers = (edges[:-1] + edges[1:]) / 2
+    fig = go.Figure(go.Bar(x=centers, y=counts, width=edges[1] - edges[0]))
+    return _layout(fig, f'Distribution of {name}', name, 'Customers')
+
+
+def scatter_figure(x, y, color, x_title, y_title, max_points=MAX_POINTS):
+    """WebGL scatter over at most max_points sampled rows"""
+    rows = downsample(len(x), max_points)
+    fig = go.Figure(go.Scattergl(
+        x=np.asarray(x)[rows], y=np.asarray(y)[rows], mode='markers',
+        marker=dict(color=np.asarray(color)[rows], colorscale='RdYlGn_r', cmin=0, cmax=1,
+                    size=5, opacity=0.6, colorbar=dict(title='churn_prob')),
+    ))
+    title = f'{y_title} vs {x_title}'
+    if len(rows) < len(x):
+        title += f' (sample of {len(rows):,} / {len(x):,})'
+    return _layout(fig, title, x_title, y_title)
+
+
+def whatif_lines_figure(grid, x, line=None, threshold=None):
+    """churn_prob against x, one line per value of the line feature"""
+    fig = go.Figure()
+    groups = grid.groupby(line, sort=True) if line else [(None, grid)]
+    for value, part in groups:
+        part = part.sort_values(x)
+        fig.add_trace(go.Scatter(x=part[x], y=part['churn_prob'], mode='lines+markers' if len(part) <= 20 else 'lines',
+                                 name=f'{line} = {value:g}' if line else 'churn_prob'))
+    if threshold is not None:
+        fig.add_hline(y=threshold, line_dash='dash', annotation_text=f'threshold {threshold:.2f}')
+    return _layout(fig, f'Churn Probability by {x}', x, 'Churn probability')
+
+
+def sensitivity_figure(sens, current_prob):
+    """Range of churn_prob reachable by changing each feature on its own"""
+    sens = sens.iloc[::-1]
+    fig = go.Figure(go.Bar(
+        y=sens['feature'], x=sens['high'] - sens['low'], base=sens['low'], orientation='h',
+        marker_color='steelblue', customdata=sens[['low_at', 'high_at', 'high']].to_numpy(),
+        hovertemplate='%{y}<br>lowest %{base:.1%} at %{customdata[0]:,.0f}'
+                      '<br>highest %{customdata[2]:.1%} at %{customdata[1]:,.0f}<extra></extra>',
+    ))
+    fig.add_vline(x=current_prob, line_dash='dash', annotation_text=f'current {current_prob:.1%}')
+    fig.update_xaxes(tickformat='.0%')
+    return _layout(fig, 'Sensitivity: one feature at a time', 'Churn probability', '')
@@ -1,4 +1,5 @@
 # Data validation and preprocessing
+import numpy as np
 import pandas as pd
 
 REQUIRED_COLS = [
@@ -20,3 +21,85 @@ def validate_batch_data(df):
     if missing:
         raise ValueError(f"Missing columns: {missing}")
     return df[REQUIRED_COLS].copy()
+
+# Row-level checks for uploaded batches: (low, high) bounds, inclusive
+VALID_RANGES = {
+    'creditscore': (300, 850),
+    'age': (18, 100),
+    'tenure': (0, 10),
+    'balance': (0, None),
+    'numofproducts': (1, 4),
+    'hascrcard': (0, 1),
+    'isactivemember': (0, 1),
+    'estimatedsalary': (0, None),
+}
+INTEGER_COLS = ['creditscore', 'age', 'tenure', 'numofproducts', 'hascrcard', 'isactivemember']
+VALID_CATEGORIES = {
+    'geography': ['France', 'Spain', 'Germany'],
+    'gender': ['Female', 'Male'],
+}
+
+
+def _row_checks(df):
+    """(reason, failing-rows mask) for every check that applies to df"""
+    checks = []
+    for col in REQUIRED_COLS:
+        if col not in df.columns:
+            continue
+        if col in VALID_CATEGORIES:
+            values = df[col]
+            checks.append((f"{col} missing", values.isna().to_numpy()))
+            checks.append((f"{col} unknown category",
+                           (~values.isin(VALID_CATEGORIES[col]) & values.notna()).to_numpy()))
+            continue
+        values = pd.to_numeric(df[col], errors='coerce').to_numpy(dtype=float)
+        missing = np.isnan(values)
+        raw_missing = df[col].isna().to_numpy()
+        checks.append((f"{col} missing", raw_missing))
+        checks.append((f"{col} not numeric", missing & ~raw_missing))
+        low, high = VALID_RANGES[col]
+        with np.errstate(invalid='ignore'):
+            out = np.zeros(len(values), dtype=bool)
+            if low is not None:
+                out |= values < low
+            if high is not None:
+                out |= values > high
+            if col in INTEGER_COLS:
+                checks.append((f"{col} not a whole number", (np.mod(values, 1) != 0) & ~missing))
+        checks.append((f"{col} out of range", out))
+    return checks
+
+
+def split_valid_rows(df):
+    """Split a batch into rows the model can score and rows to quarantine.
+
+    Only the REQUIRED_COLS present in df are checked; missing columns are
+    left to validate_batch_data. Every check is a whole-column operation.
+    Failures are packed into one bit per check, so building the reason text
+    only touches the distinct failure combinations, not every bad row.
+
+    Returns
+    -------
+    (DataFrame, DataFrame) : valid rows with numeric columns as numbers, and
+        invalid rows with their 1-based ``row`` position and a ``reason``
+    """
+    checks = _row_checks(df)
+    codes = np.zeros(len(df), dtype=np.int64)
+    for bit, (_, failed) in enumerate(checks):
+        codes |= failed.astype(np.int64) << bit
+    bad = codes != 0
+
+    valid = df[~bad] if bad.any() else df
+    if bad.any() or any(not pd.api.types.is_numeric_dtype(df[c]) for c in VALID_RANGES if c in df):
+        valid = valid.copy()
+        for col in VALID_RANGES:
+            if col in valid.columns and not pd.api.types.is_numeric_dtype(valid[col]):
+                valid[col] = pd.to_numeric(valid[col])
+
+    quarantine = df[bad].copy()
+    quarantine.insert(0, 'row', np.flatnonzero(bad) + 1)
+    uniques, inverse = np.unique(codes[bad], return_inverse=True)
+    labels = np.array(['; '.join(reason for bit, (reason, _) in enumerate(checks) if code >> bit & 1)
+                       for code in uniques], dtype=object)
+    quarantine['reason'] = labels[inverse]
+    return valid, quarantine
@@ -0,0 +1,171 @@
+# Delta detection for repeated customer uploads
+import os
+import threading
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from utils.file_utils import MODEL_DTYPES, MODEL_FEATURES
+from utils.shared_cache import atomic_write, predict_churn_proba, shared_cache_dir
+
+NEW, CHANGED, UNCHANGED = 0, 1, 2
+
+# Feature columns whose values make up a customer's fingerprint
+FINGERPRINT_COLS = [c for c in MODEL_FEATURES if c != "customerid"]
+
+
+def default_index_path():
+    """Index lives next to the shared cache when there is one, else in .cache/"""
+    return os.path.join(shared_cache_dir() or ".cache", "delta_index.npz")
+
+
+def fingerprint(df):
+    """One uint64 hash per row over the feature values present in df.
+
+    Values are normalised first (numerics to float64, categoricals to str),
+    so the same customer hashes the same whether it was parsed as int64,
+    float64, object or category.
+    """
+    cols = [c for c in FINGERPRINT_COLS if c in df.columns]
+    values = pd.DataFrame({
+        c: df[c].astype(str) if MODEL_DTYPES[c] == "category"
+        else pd.to_numeric(df[c], errors="coerce").astype("float64")
+        for c in cols
+    })
+    return pd.util.hash_pandas_object(values, index=False).to_numpy()
+
+
+class DeltaIndex:
+    """customerid -> (feature fingerprint, last churn_prob), stored as flat arrays"""
+
+    def __init__(self, ids=None, fingerprints=None, scores=None, model_key="", sec_per_row=0.0):
+        self.ids = np.asarray(ids if ids is not None else [], dtype=np.int64)
+        self.fingerprints = np.asarray(fingerprints if fingerprints is not None else [], dtype=np.uint64)
+        self.scores = np.asarray(scores if scores is not None else [], dtype=np.float64)
+        self.model_key = model_key
+        self.sec_per_row = sec_per_row
+
+    @classmethod
+    def load(cls, path):
+        if not os.path.exists(path):
+            return cls()
+        with np.load(path) as data:
+            return cls(data["ids"], data["fingerprints"], data["scores"],
+                       str(data["model_key"]), float(data["sec_per_row"]))
+
+    def save(self, path):
+        def _save(tmp):
+            with open(tmp, "wb") as f:
+                np.savez(f, ids=self.ids, fingerprints=self.fingerprints, scores=self.scores,
+                         model_key=self.model_key, sec_per_row=self.sec_per_row)
+        atomic_write(path, _save)
+
+    def classify(self, ids, fingerprints, model_key):
+        """Vectorized join of a batch against the index.
+
+        Returns
+        -------
+        tuple : (status, prior_scores) - status is NEW/CHANGED/UNCHANGED per
+            row, prior_scores is NaN wherever the row must be rescored.
+        """
+        status = np.full(len(ids), NEW, dtype=np.int8)
+        prior = np.full(len(ids), np.nan)
+        if not len(self.ids) or model_key != self.model_key:
+            # scores from another model are stale: everything known counts as changed
+            if len(self.ids):
+                status[pd.Index(self.ids).get_indexer(ids) >= 0] = CHANGED
+            return status, prior
+
+        pos = pd.Index(self.ids).get_indexer(ids)
+        known = pos >= 0
+        same = known.copy()
+        same[known] = self.fingerprints[pos[known]] == fingerprints[known]
+        status[known] = CHANGED
+        status[same] = UNCHANGED
+        prior[same] = self.scores[pos[same]]
+        return status, prior
+
+    def update(self, ids, fingerprints, scores, model_key):
+        """Merge a scored batch into the index (latest values win)"""
+        if model_key != self.model_key:
+            self.ids = self.ids[:0]
+            self.fingerprints = self.fingerprints[:0]
+            self.scores = self.scores[:0]
+            self.model_key = model_key
+        merged = pd.DataFrame(
+            {"fp": np.concatenate([self.fingerprints, fingerprints]),
+             "score": np.concatenate([self.scores, scores])},
+            index=np.concatenate([self.ids, ids]),
+        )
+        merged = merged[~merged.index.duplicated(keep="last")]
+        self.ids = merged.index.to_numpy(dtype=np.int64)
+        self.fingerprints = merged["fp"].to_numpy(dtype=np.uint64)
+        self.scores = merged["score"].to_numpy(dtype=np.float64)
+
+
+# Loaded indexes stay in memory between reruns until the file changes
+_loaded = {}
+# Every session of the process shares those indexes; reads and updates go through this lock
+_lock = threading.Lock()
+
+
+def _load_cached(path):
+    mtime = os.path.getmtime(path) if os.path.exists(path) else None
+    cached = _loaded.get(path)
+    if cached is None or cached[0] != mtime:
+        cached = (mtime, DeltaIndex.load(path))
+        _loaded[path] = cached
+    return cached[1]
+
+
+def score_with_delta(pipeline, df, model_key=None, path=None):
+    """Score only new or changed customers, reusing prior scores for the rest.
+
+    Returns
+    -------
+    tuple : (churn_prob, stats) - stats has new/changed/unchanged counts,
+        the seconds spent scoring and an estimate of the seconds saved.
+    """
+    path = path or default_index_path()
+    model_key = model_key or joblib.hash(pipeline)
+
+    ids = pd.to_numeric(df["customerid"], errors="coerce")
+    has_id = ids.notna().to_numpy()
+    ids = ids.fillna(-1).to_numpy(dtype=np.int64)
+    fps = fingerprint(df)
+
+    with _lock:
+        status, probs = _load_cached(path).classify(ids, fps, model_key)
+    status[~has_id] = NEW
+    probs[~has_id] = np.nan
+    todo = np.isnan(probs)
+
+    start = time.perf_counter()
+    if todo.any():
+        probs[todo] = predict_churn_proba(pipeline, df[todo], model_key)
+    seconds = time.perf_counter() - start
+
+    fresh = todo & has_id
+    with _lock:
+        # reload: another session may have updated the index while this one scored
+        index = _load_cached(path)
+        if todo.any():
+            # row-weighted running rate, so tiny deltas dominated by overhead don't skew it
+            seen = len(index.ids) if model_key == index.model_key else 0
+            index.sec_per_row = (index.sec_per_row * seen + seconds) / (seen + todo.sum())
+        if fresh.any():
+            index.update(ids[fresh], fps[fresh], probs[fresh], model_key)
+            index.save(path)
+            _loaded[path] = (os.path.getmtime(path), index)
+        sec_per_row = index.sec_per_row
+
+    stats = {
+        "new": int((status == NEW).sum()),
+        "changed": int((status == CHANGED).sum()),
+        "unchanged": int((status == UNCHANGED).sum()),
+        "score_seconds": seconds,
+        "saved_seconds": sec_per_row * int((~todo).sum()),
+    }
+    return probs, stats
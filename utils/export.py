@@ -0,0 +1,106 @@
+# Chunked, optionally compressed export of scored results
+import gzip
+import os
+import tempfile
+import time
+
+try:
+    import zstandard
+except ImportError:  # optional: zstd export is offered only when installed
+    zstandard = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # optional: Parquet export is offered only when installed
+    pa = pq = None
+
+CHUNK_ROWS = 100_000
+# Streamlit's download button holds the whole file in memory, so default to a compressed one
+DEFAULT_FORMAT = "CSV (gzip)"
+EXPORT_DIR = os.path.join(".cache", "exports")
+# Exports older than this belong to closed sessions and are removed
+MAX_EXPORT_AGE_SECONDS = 6 * 3600
+
+# format label -> (file extension, mime type)
+EXPORT_FORMATS = {
+    "CSV": (".csv", "text/csv"),
+    "CSV (gzip)": (".csv.gz", "application/gzip"),
+    "CSV (zstd)": (".csv.zst", "application/zstd"),
+    "Parquet": (".parquet", "application/vnd.apache.parquet"),
+}
+
+
+def available_formats():
+    """Export formats usable with the installed libraries"""
+    formats = ["CSV", "CSV (gzip)"]
+    if zstandard is not None:
+        formats.append("CSV (zstd)")
+    if pq is not None:
+        formats.append("Parquet")
+    return formats
+
+
+def iter_csv_chunks(df, chunk_rows=CHUNK_ROWS):
+    """Yield the CSV encoding of df one chunk of rows at a time"""
+    for start in range(0, max(len(df), 1), chunk_rows):
+        chunk = df.iloc[start:start + chunk_rows]
+        yield chunk.to_csv(index=False, header=start == 0).encode()
+
+
+def _write_parquet(df, path, chunk_rows):
+    writer = None
+    try:
+        for start in range(0, max(len(df), 1), chunk_rows):
+            table = pa.Table.from_pandas(df.iloc[start:start + chunk_rows], preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(path, table.schema, compression="zstd")
+            writer.write_table(table)
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+def write_export(df, fmt, path, chunk_rows=CHUNK_ROWS):
+    """Write df to path in the given format, serializing one chunk at a time"""
+    if fmt == "Parquet":
+        _write_parquet(df, path, chunk_rows)
+        return path
+
+    if fmt == "CSV (gzip)":
+        out = gzip.open(path, "wb", compresslevel=6)
+    elif fmt == "CSV (zstd)":
+        out = zstandard.ZstdCompressor(level=3).stream_writer(open(path, "wb"))
+    else:
+        out = open(path, "wb")
+    with out:
+        for data in iter_csv_chunks(df, chunk_rows):
+            out.write(data)
+    return path
+
+
+def export_to_tempfile(df, fmt, directory=None, chunk_rows=CHUNK_ROWS):
+    """Export df to a new temp file; returns (path, mime type)"""
+    ext, mime = EXPORT_FORMATS[fmt]
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    fd, path = tempfile.mkstemp(suffix=ext, dir=directory)
+    os.close(fd)
+    write_export(df, fmt, path, chunk_rows)
+    return path, mime
+
+
+def remove_stale_exports(directory=EXPORT_DIR, max_age=MAX_EXPORT_AGE_SECONDS):
+    """Delete export files older than max_age seconds; returns how many were removed"""
+    if not os.path.isdir(directory):
+        return 0
+    cutoff = time.time() - max_age
+    removed = 0
+    for entry in os.scandir(directory):
+        try:
+            if entry.is_file() and entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
+                removed += 1
+        except FileNotFoundError:  # another session removed it first
+            pass
+    return removed
@@ -0,0 +1,196 @@
+# Memory-mapped store of preprocessed features for the whole customer base
+import json
+import os
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from utils.delta_index import fingerprint
+from utils.shared_cache import atomic_write, shared_cache_dir
+
+# Rows per chunk when rescoring; a chunk of the float64 matrix stays in cache-friendly sizes
+CHUNK_ROWS = 100_000
+# Capacity of a fresh store, doubled whenever it fills up
+INITIAL_CAPACITY = 1024
+
+
+def default_store_dir():
+    """Store lives next to the shared cache when there is one, else in .cache/"""
+    return os.path.join(shared_cache_dir() or ".cache", "feature_store")
+
+
+def preprocessing_key(pipeline):
+    """Hash of the fitted steps before the estimator"""
+    return joblib.hash(pipeline[:-1])
+
+
+class FeatureStore:
+    """customerid -> encoded feature row, kept in a memory-mapped .npy file.
+
+    features.npy holds one row per customer in the pipeline's transformed
+    feature space (scaled numerics, one-hot categoricals), with spare
+    capacity at the end. ids.npy and fingerprints.npy are the row index and
+    the raw-feature hashes used to skip unchanged customers on update.
+    meta.json records the row count and which preprocessing built the rows.
+    """
+
+    def __init__(self, directory=None):
+        self.directory = directory or default_store_dir()
+        meta_path = self._path("meta.json")
+        if os.path.exists(meta_path):
+            with open(meta_path) as f:
+                self.meta = json.load(f)
+            self.ids = np.load(self._path("ids.npy"))
+            self.fingerprints = np.load(self._path("fingerprints.npy"))
+            self.features = np.load(self._path("features.npy"), mmap_mode="r+")
+        else:
+            self.meta = {"rows": 0, "preprocessing": None, "feature_names": []}
+            self.ids = np.empty(0, dtype=np.int64)
+            self.fingerprints = np.empty(0, dtype=np.uint64)
+            self.features = None
+        self._index = None
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    def __len__(self):
+        return self.meta["rows"]
+
+    @property
+    def index(self):
+        if self._index is None:
+            self._index = pd.Index(self.ids)
+        return self._index
+
+    def _allocate(self, capacity, n_features):
+        """(Re)create features.npy with room for capacity rows, keeping current rows"""
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path("features.npy")
+        tmp = path + ".tmp"
+        grown = np.lib.format.open_memmap(tmp, mode="w+", dtype=np.float64, shape=(capacity, n_features))
+        rows = len(self)
+        if self.features is not None and rows:
+            for start in range(0, rows, CHUNK_ROWS):
+                stop = min(rows, start + CHUNK_ROWS)
+                grown[start:stop] = self.features[start:stop]
+        grown.flush()
+        del grown
+        self.features = None
+        os.replace(tmp, path)
+        self.features = np.load(path, mmap_mode="r+")
+
+    def _reset(self, key, feature_names):
+        self.meta = {"rows": 0, "preprocessing": key, "feature_names": list(feature_names)}
+        self.ids = self.ids[:0]
+        self.fingerprints = self.fingerprints[:0]
+        self.features = None
+        self._index = None
+
+    def upsert(self, pipeline, df):
+        """Encode new and changed customers in df and write them into the store.
+
+        Only rows whose raw features changed are transformed. A pipeline with
+        different preprocessing invalidates every stored row, so the store
+        starts over.
+
+        Returns
+        -------
+        dict : added / updated / unchanged row counts
+        """
+        key = preprocessing_key(pipeline)
+        preprocessor = pipeline[:-1]
+        if key != self.meta["preprocessing"]:
+            self._reset(key, preprocessor.get_feature_names_out())
+
+        ids = pd.to_numeric(df["customerid"], errors="coerce")
+        keep = ids.notna().to_numpy()
+        df = df[keep]
+        # latest row wins when a customer appears twice in one batch
+        ids = ids[keep].to_numpy(dtype=np.int64)
+        last = ~pd.Index(ids).duplicated(keep="last")
+        df, ids = df[last], ids[last]
+        fps = fingerprint(df)
+
+        pos = self.index.get_indexer(ids) if len(self) else np.full(len(ids), -1)
+        known = pos >= 0
+        changed = known.copy()
+        changed[known] = self.fingerprints[pos[known]] != fps[known]
+        new = ~known
+        todo = changed | new
+
+        if todo.any():
+            encoded = np.asarray(preprocessor.transform(df[todo]), dtype=np.float64)
+            n_features = encoded.shape[1]
+            n_new = int(new.sum())
+            rows = len(self)
+            capacity = 0 if self.features is None else self.features.shape[0]
+            if rows + n_new > capacity:
+                self._allocate(max(INITIAL_CAPACITY, 2 * (rows + n_new)), n_features)
+
+            slots = pos[todo].copy()
+            fresh = slots < 0
+            slots[fresh] = np.arange(rows, rows + n_new)
+            self.features[slots] = encoded
+            self.features.flush()
+
+            self.ids = np.concatenate([self.ids, ids[new]])
+            self.fingerprints = np.concatenate([self.fingerprints, np.zeros(n_new, dtype=np.uint64)])
+            self.fingerprints[slots] = fps[todo]
+            self.meta["rows"] = rows + n_new
+            self._index = None
+            self._save_index()
+
+        return {"added": int(new.sum()), "updated": int(changed.sum()),
+                "unchanged": int((known & ~changed).sum())}
+
+    def _save_index(self):
+        def _npy(array):
+            def _save(tmp):
+                with open(tmp, "wb") as f:
+                    np.save(f, array)
+            return _save
+
+        atomic_write(self._path("ids.npy"), _npy(self.ids))
+        atomic_write(self._path("fingerprints.npy"), _npy(self.fingerprints))
+
+        def _meta(tmp):
+            with open(tmp, "w") as f:
+                json.dump(self.meta, f)
+
+        # meta last: a reader never sees a row count the other files don't cover
+        atomic_write(self._path("meta.json"), _meta)
+
+    def iter_chunks(self, chunk_rows=CHUNK_ROWS):
+        """Yield (ids, features) over the stored rows as views of the memmap"""
+        rows = len(self)
+        for start in range(0, rows, chunk_rows):
+            stop = min(rows, start + chunk_rows)
+            yield self.ids[start:stop], self.features[start:stop]
+
+    def lookup(self, ids):
+        """Encoded rows for the given customer ids (KeyError when unknown)"""
+        pos = self.index.get_indexer(np.asarray(ids, dtype=np.int64))
+        if (pos < 0).any():
+            raise KeyError(f"{int((pos < 0).sum())} customer ids not in the feature store")
+        return self.features[pos]
+
+    def score(self, pipeline, chunk_rows=CHUNK_ROWS):
+        """Churn probability for every stored customer, chunk by chunk.
+
+        The pipeline must share the store's preprocessing; only its final
+        estimator runs, directly on the encoded matrix.
+
+        Returns
+        -------
+        tuple : (ids, churn_prob) arrays in store order
+        """
+        if preprocessing_key(pipeline) != self.meta["preprocessing"]:
+            raise ValueError("pipeline preprocessing differs from the feature store; rebuild it with upsert()")
+        estimator = pipeline[-1]
+        probs = np.empty(len(self))
+        start = 0
+        for _, features in self.iter_chunks(chunk_rows):
+            probs[start:start + len(features)] = estimator.predict_proba(features)[:, 1]
+            start += len(features)
+        return self.ids[:len(self)].copy(), probs
@@ -1,6 +1,16 @@
 # File upload handling
+import csv
+import io
+import re
 import streamlit as st
 import pandas as pd
+from utils.timing import timed
+
+try:
+    import pyarrow  # noqa: F401  (multi-threaded CSV engine for pandas)
+    CSV_ENGINE = "pyarrow"
+except ImportError:
+    CSV_ENGINE = "c"
 
 # Exact columns the model pipeline expects (order matters for predict_proba)
 MODEL_FEATURES = [
@@ -9,6 +19,85 @@ MODEL_FEATURES = [
     "isactivemember", "estimatedsalary",
 ]
 
+# Explicit parse dtypes, so no per-column type inference is needed
+MODEL_DTYPES = {
+    "customerid": "int64",
+    "creditscore": "int64",
+    "geography": "category",
+    "gender": "category",
+    "age": "int64",
+    "tenure": "int64",
+    "balance": "float64",
+    "numofproducts": "int64",
+    "hascrcard": "int64",
+    "isactivemember": "int64",
+    "estimatedsalary": "float64",
+}
+
+# Known outcome column; kept by uploads that include it so the shadow log can report lift
+LABEL_COL = "exited"
+
+
+def _normalise_name(name):
+    """'Credit Score', ' CreditScore', 'credit_score' -> 'creditscore'"""
+    return re.sub(r"[\s_]+", "", name).lower()
+
+
+def sniff_header(source):
+    """Read just the header row of a CSV path or file-like object"""
+    if hasattr(source, "read"):
+        pos = source.tell()
+        first = source.readline()
+        source.seek(pos)
+        if isinstance(first, bytes):
+            first = first.decode("utf-8-sig", errors="replace")
+    else:
+        with open(source, newline="", encoding="utf-8-sig") as f:
+            first = f.readline()
+    return next(csv.reader(io.StringIO(first)), [])
+
+
+def read_model_columns(source, engine=None, label_col=None):
+    """Parse only the MODEL_FEATURES columns of a CSV.
+
+    The header is sniffed first and matched to MODEL_FEATURES ignoring case,
+    whitespace and underscores; only matched columns are parsed, with
+    explicit dtypes, by the fastest available engine (pyarrow, multi-threaded,
+    unless engine is given; the C engine uses less peak memory). When
+    label_col is given and present, it is parsed too and kept last.
+
+    Returns
+    -------
+    DataFrame | None : model columns in MODEL_FEATURES order (then the
+        label), or None when the header contains none of the model columns.
+    """
+    mapping = {}
+    label = None
+    for raw in sniff_header(source):
+        name = _normalise_name(raw)
+        if name in MODEL_FEATURES and name not in mapping.values():
+            mapping[raw] = name
+        elif label_col is not None and name == label_col and label is None:
+            label = raw
+    if not mapping:
+        return None
+
+    engine = engine or CSV_ENGINE
+    dtypes = {raw: MODEL_DTYPES[name] for raw, name in mapping.items()}
+    if label is not None:
+        # outcomes may be missing for some rows; their dtype is inferred
+        mapping[label] = label_col
+    pos = source.tell() if hasattr(source, "read") else None
+    try:
+        df = pd.read_csv(source, usecols=list(mapping), dtype=dtypes, engine=engine)
+    except (ValueError, TypeError):
+        # missing or malformed values: fall back to inferred dtypes
+        if pos is not None:
+            source.seek(pos)
+        df = pd.read_csv(source, usecols=list(mapping), engine=engine)
+    df = df.rename(columns=mapping)
+    return df[[c for c in MODEL_FEATURES + [label_col] if c in df.columns]]
+
 def handle_file_upload():
     """Handle CSV upload with validation.
 
@@ -22,19 +111,14 @@ def handle_file_upload():
 
     if uploaded_file is not None:
         try:
-            raw = pd.read_csv(uploaded_file)
-
-            # Normalise column names to lower-case so matching is case-insensitive
-            raw.columns = [c.strip().lower() for c in raw.columns]
-
-            # Keep only the columns the model needs, in the right order
-            available = [c for c in MODEL_FEATURES if c in raw.columns]
+            # Only the model columns (and exited, if present) are parsed; names match case-insensitively
+            with timed("upload_parse"):
+                df = read_model_columns(uploaded_file, label_col=LABEL_COL)
 
-            if not available:
+            if df is None:
                 # None of the required features exist – signal the caller
                 return None, uploaded_file.name, "no_features"
 
-            df = raw[available]
             return df, uploaded_file.name, None
 
         except Exception as e:
@@ -1,12 +1,12 @@
 # Business KPIs calculator
-def calculate_kpis(df, predictions):
+def calculate_kpis(df, predictions, customer_value=1000, promotion_cost=200):
     """Calculate business KPIs from predictions"""
     total = len(df)
     churners = predictions.sum()
     rate = churners / total
     
-    # Business logic: $1000/customer saved, $200/false positive
-    net_value = churners * 1000 - (total - churners) * 200
+    # Business logic: $1000/customer saved, $200/false positive by default
+    net_value = churners * customer_value - (total - churners) * promotion_cost
     
     return {
         'total': total,
@@ -1,13 +1,19 @@
 import joblib
 import json
+from utils.timing import timed
+
+MODEL_PATH = "models/churn_pipeline.pkl"
+REPORT_PATH = "reports/churn_model_report.json"
 
 def load_churn_model():
     # Load pipeline
-    model_data = joblib.load("models/churn_pipeline.pkl")
+    with timed("model_load"):
+        model_data = joblib.load(MODEL_PATH)
 
     # Load report
-    with open("reports/churn_model_report.json", "r") as f:
-        report_data = json.load(f)
+    with timed("report_load"):
+        with open(REPORT_PATH, "r") as f:
+            report_data = json.load(f)
 
     return {
         "pipeline": model_data["pipeline"],
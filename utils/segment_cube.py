@@ -0,0 +1,153 @@
+# Precomputed churn aggregates across customer segments
+import numpy as np
+import pandas as pd
+
+from utils.charts import AGE_BINS, AGE_LABELS, BALANCE_BINS, BALANCE_LABELS, bin_index
+
+# dimension -> labels along that axis; the last label catches anything unmapped
+DIMENSIONS = {
+    "geography": ["France", "Spain", "Germany", "Other"],
+    "gender": ["Female", "Male", "Other"],
+    "age_band": AGE_LABELS + ["Unknown"],
+    "balance_band": BALANCE_LABELS + ["Unknown"],
+    "numofproducts": ["1", "2", "3", "4", "Other"],
+}
+
+
+def _category_codes(values, labels):
+    codes = pd.Categorical(np.asarray(values, dtype=object), categories=labels[:-1]).codes
+    return np.where(codes < 0, len(labels) - 1, codes)
+
+
+def _band_codes(values, edges, labels, include_lowest=False):
+    idx = bin_index(pd.to_numeric(values, errors="coerce"), edges, include_lowest)
+    return np.where(idx < 0, len(labels) - 1, idx)
+
+
+def segment_codes(df):
+    """Axis position of every row along each dimension, as int arrays"""
+    n = len(df)
+    missing = {name: np.full(n, len(labels) - 1) for name, labels in DIMENSIONS.items()}
+    codes = {}
+    codes["geography"] = (_category_codes(df["geography"], DIMENSIONS["geography"])
+                          if "geography" in df else missing["geography"])
+    codes["gender"] = (_category_codes(df["gender"], DIMENSIONS["gender"])
+                       if "gender" in df else missing["gender"])
+    codes["age_band"] = (_band_codes(df["age"], AGE_BINS, DIMENSIONS["age_band"])
+                         if "age" in df else missing["age_band"])
+    codes["balance_band"] = (_band_codes(df["balance"], BALANCE_BINS, DIMENSIONS["balance_band"], True)
+                             if "balance" in df else missing["balance_band"])
+    if "numofproducts" in df:
+        products = pd.to_numeric(df["numofproducts"], errors="coerce").to_numpy()
+        codes["numofproducts"] = _band_codes(products, [0.5, 1.5, 2.5, 3.5, 4.5], DIMENSIONS["numofproducts"])
+    else:
+        codes["numofproducts"] = missing["numofproducts"]
+    return codes
+
+
+class SegmentCube:
+    """Counts, churners and summed churn probability for every combination of
+    geography x gender x age band x balance band x product count.
+
+    Built in one pass over scored rows; every slice or roll-up afterwards
+    works on the small dense arrays only. Cubes built from separate chunks
+    add up with merge() / +.
+    """
+
+    def __init__(self, counts=None, churners=None, prob_sum=None):
+        shape = tuple(len(labels) for labels in DIMENSIONS.values())
+        self.counts = np.zeros(shape, dtype=np.int64) if counts is None else counts
+        self.churners = np.zeros(shape, dtype=np.int64) if churners is None else churners
+        self.prob_sum = np.zeros(shape) if prob_sum is None else prob_sum
+
+    @classmethod
+    def from_frame(cls, df, pred_col="prediction", prob_col="churn_prob"):
+        """Aggregate a scored frame (or chunk) into a cube"""
+        cube = cls()
+        codes = segment_codes(df)
+        flat = np.ravel_multi_index([codes[name] for name in DIMENSIONS], cube.counts.shape)
+        size = cube.counts.size
+        cube.counts = np.bincount(flat, minlength=size).reshape(cube.counts.shape)
+        if pred_col in df:
+            cube.churners = np.bincount(flat, weights=df[pred_col].to_numpy(dtype=float),
+                                        minlength=size).round().astype(np.int64).reshape(cube.counts.shape)
+        if prob_col in df:
+            cube.prob_sum = np.bincount(flat, weights=df[prob_col].to_numpy(dtype=float),
+                                        minlength=size).reshape(cube.counts.shape)
+        return cube
+
+    @classmethod
+    def from_chunks(cls, chunks, pred_col="prediction", prob_col="churn_prob"):
+        """Build one cube from an iterable of scored chunks"""
+        cube = cls()
+        for chunk in chunks:
+            cube = cube.merge(cls.from_frame(chunk, pred_col, prob_col))
+        return cube
+
+    def merge(self, other):
+        return SegmentCube(self.counts + other.counts, self.churners + other.churners,
+                           self.prob_sum + other.prob_sum)
+
+    __add__ = merge
+
+    @property
+    def total(self):
+        return int(self.counts.sum())
+
+    def rollup(self, *dims, **filters):
+        """Aggregate to the given dimensions, optionally slicing others first.
+
+        ``cube.rollup("age_band", geography="Germany")`` gives churn per age
+        band for German customers. Filter values may be a label or a list.
+
+        Returns
+        -------
+        DataFrame : customers, churners, churn_rate, mean_prob per segment
+        """
+        names = list(DIMENSIONS)
+        index = []
+        for name in names:
+            if name in filters:
+                wanted = filters[name]
+                wanted = [wanted] if isinstance(wanted, (str, int)) else list(wanted)
+                index.append([DIMENSIONS[name].index(str(v)) for v in wanted])
+            else:
+                index.append(slice(None))
+
+        def reduce(arr):
+            for axis, sel in enumerate(index):
+                if not isinstance(sel, slice):
+                    arr = np.take(arr, sel, axis=axis)
+            keep = tuple(names.index(d) for d in dims)
+            drop = tuple(a for a in range(arr.ndim) if a not in keep)
+            arr = arr.sum(axis=drop)
+            # order axes as requested
+            order = np.argsort(np.argsort(keep)) if keep else ()
+            return np.transpose(arr, order) if keep else arr
+
+        counts = reduce(self.counts)
+        churners = reduce(self.churners)
+        prob_sum = reduce(self.prob_sum)
+
+        if len(dims) == 1:
+            sel = index[names.index(dims[0])]
+            idx = pd.Index(DIMENSIONS[dims[0]] if isinstance(sel, slice)
+                           else [DIMENSIONS[dims[0]][i] for i in sel], name=dims[0])
+        elif dims:
+            labels = [
+                [DIMENSIONS[d][i] for i in index[names.index(d)]]
+                if not isinstance(index[names.index(d)], slice) else DIMENSIONS[d]
+                for d in dims
+            ]
+            idx = pd.MultiIndex.from_product(labels, names=list(dims))
+        else:
+            idx = pd.Index(["All"])
+        out = pd.DataFrame({
+            "customers": np.ravel(counts),
+            "churners": np.ravel(churners),
+            "prob_sum": np.ravel(prob_sum),
+        }, index=idx)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            out["churn_rate"] = out["churners"] / out["customers"]
+            out["mean_prob"] = out["prob_sum"] / out["customers"]
+        return out.drop(columns="prob_sum")
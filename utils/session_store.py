@@ -0,0 +1,169 @@
+# Per-session storage of scored batches under a global memory cap
+import os
+import shutil
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+import pandas as pd
+import streamlit as st
+
+try:
+    import pyarrow  # noqa: F401  (Parquet spill files)
+    SPILL_FORMAT = "parquet"
+except ImportError:  # optional: without pyarrow batches spill as pickles
+    SPILL_FORMAT = "pickle"
+
+# Memory all sessions' in-memory batches may use together, per process
+MEMORY_CAP_ENV = "CHURN_SESSION_MEMORY_MB"
+DEFAULT_MEMORY_CAP_MB = 1024
+# Batches untouched this long belong to closed sessions and are dropped
+MAX_IDLE_SECONDS = 12 * 3600
+
+
+def current_session_id():
+    """Stable id of the current Streamlit session"""
+    return st.session_state.setdefault("session_id", uuid.uuid4().hex[:12])
+
+
+def frame_bytes(df):
+    """Memory held by a DataFrame, including object and category contents"""
+    return int(df.memory_usage(deep=True, index=True).sum())
+
+
+class _Entry:
+    __slots__ = ("frame", "rows", "nbytes", "path", "meta", "last_used")
+
+    def __init__(self, frame, meta):
+        self.frame = frame
+        self.rows = len(frame)
+        self.nbytes = frame_bytes(frame)
+        self.path = None
+        self.meta = meta
+        self.last_used = time.time()
+
+
+class SessionStore:
+    """Scored batches per (session, name), kept in memory up to a global cap.
+
+    When the cap is exceeded, least-recently-used batches of any session are
+    written to columnar files under spill_dir and dropped from memory; get()
+    reads them back transparently. The cap is per process - each worker of a
+    launch_cluster.py deployment enforces its own.
+    """
+
+    def __init__(self, cap_bytes=None, spill_dir=None):
+        if cap_bytes is None:
+            cap_bytes = float(os.getenv(MEMORY_CAP_ENV, DEFAULT_MEMORY_CAP_MB)) * 2**20
+        self.cap_bytes = cap_bytes
+        self.spill_dir = spill_dir or os.path.join(".cache", "sessions")
+        self._entries = OrderedDict()   # (session, name) -> _Entry, LRU first
+        self._lock = threading.RLock()
+
+    @property
+    def memory_bytes(self):
+        with self._lock:
+            return sum(e.nbytes for e in self._entries.values() if e.frame is not None)
+
+    def put(self, session, name, df, **meta):
+        """Store df for the session, replacing any earlier batch under name"""
+        with self._lock:
+            self._remove((session, name))
+            self._drop_idle()
+            self._entries[(session, name)] = _Entry(df, meta)
+            self._enforce_cap(keep=(session, name))
+
+    def get(self, session, name):
+        """(DataFrame, meta) for the session's batch, or None; reloads spilled batches"""
+        with self._lock:
+            entry = self._entries.get((session, name))
+            if entry is None:
+                return None
+            if entry.frame is None:
+                entry.frame = self._read(entry.path)
+                entry.nbytes = frame_bytes(entry.frame)
+                os.remove(entry.path)
+                entry.path = None
+            entry.last_used = time.time()
+            self._entries.move_to_end((session, name))
+            self._enforce_cap(keep=(session, name))
+            return entry.frame, entry.meta
+
+    def session_bytes(self, session):
+        """Bytes the session's batches currently hold in memory"""
+        with self._lock:
+            return sum(e.nbytes for (s, _), e in self._entries.items() if s == session and e.frame is not None)
+
+    def drop_session(self, session):
+        """Forget every batch of a session, including spilled files"""
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == session]:
+                self._remove(key)
+            shutil.rmtree(os.path.join(self.spill_dir, str(session)), ignore_errors=True)
+
+    def usage(self):
+        """Memory and spilled bytes per session, as a DataFrame"""
+        with self._lock:
+            rows = [{"session": session, "batch": name, "rows": e.rows,
+                     "in_memory_mb": e.nbytes / 2**20 if e.frame is not None else 0.0,
+                     "spilled_mb": os.path.getsize(e.path) / 2**20 if e.path else 0.0,
+                     "idle_s": time.time() - e.last_used}
+                    for (session, name), e in self._entries.items()]
+        return pd.DataFrame(rows, columns=["session", "batch", "rows", "in_memory_mb", "spilled_mb", "idle_s"])
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None and entry.path and os.path.exists(entry.path):
+            os.remove(entry.path)
+
+    def _drop_idle(self):
+        cutoff = time.time() - MAX_IDLE_SECONDS
+        for key in [k for k, e in self._entries.items() if e.last_used < cutoff]:
+            self._remove(key)
+
+    def _enforce_cap(self, keep):
+        """Spill least-recently-used batches until memory fits under the cap.
+
+        The batch being stored or read (keep) stays in memory even when it
+        alone is over the cap, since the page is about to use it.
+        """
+        used = self.memory_bytes
+        for key, entry in list(self._entries.items()):
+            if used <= self.cap_bytes:
+                break
+            if key == keep or entry.frame is None:
+                continue
+            self._spill(key, entry)
+            used -= entry.nbytes
+
+    def _spill(self, key, entry):
+        session, name = key
+        directory = os.path.join(self.spill_dir, str(session))
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{name}.{SPILL_FORMAT}")
+        if SPILL_FORMAT == "parquet":
+            entry.frame.to_parquet(path, index=True)
+        else:
+            entry.frame.to_pickle(path)
+        entry.path = path
+        entry.frame = None
+
+    @staticmethod
+    def _read(path):
+        if path.endswith(".parquet"):
+            return pd.read_parquet(path)
+        return pd.read_pickle(path)
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def session_store():
+    """Process-wide SessionStore shared by all Streamlit sessions"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = SessionStore()
+        return _store
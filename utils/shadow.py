@@ -0,0 +1,184 @@
+# Champion/challenger shadow scoring
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.pipeline import Pipeline
+
+from utils.file_utils import LABEL_COL
+from utils.shared_cache import atomic_write, shared_cache_dir
+
+logger = logging.getLogger("churn.shadow")
+
+# Path to a challenger artifact laid out like models/churn_pipeline.pkl
+CHALLENGER_ENV = "CHURN_CHALLENGER_MODEL"
+
+
+def default_shadow_dir():
+    """Shadow logs live next to the shared cache when there is one, else in .cache/"""
+    return os.path.join(shared_cache_dir() or ".cache", "shadow")
+
+
+def load_challenger(path=None):
+    """Challenger model_data from CHURN_CHALLENGER_MODEL, or None when unset"""
+    path = path or os.getenv(CHALLENGER_ENV)
+    if not path:
+        return None
+    return joblib.load(path)
+
+
+def same_preprocessing(champion, challenger):
+    """True when both pipelines share identical fitted steps before the estimator"""
+    if not (isinstance(champion, Pipeline) and isinstance(challenger, Pipeline)):
+        return False
+    if len(champion) < 2 or len(challenger) < 2:
+        return False
+    return joblib.hash(champion[:-1]) == joblib.hash(challenger[:-1])
+
+
+def _ranks(values):
+    ranks = np.empty(len(values))
+    ranks[np.argsort(values, kind="stable")] = np.arange(len(values))
+    return ranks
+
+
+def _top_lift(probs, labels, share=0.1):
+    """Churn rate in the top share of scores over the overall churn rate"""
+    k = max(1, int(len(probs) * share))
+    top = np.argpartition(probs, -k)[-k:]
+    base = labels.mean()
+    return float(labels[top].mean() / base) if base > 0 else float("nan")
+
+
+def compare_scores(champion, challenger, champion_threshold, challenger_threshold, labels=None):
+    """Agreement and lift statistics for one batch scored by both models"""
+    champ_flag = champion > champion_threshold
+    chall_flag = challenger > challenger_threshold
+    k = max(1, len(champion) // 10)
+    champ_top = set(np.argpartition(champion, -k)[-k:].tolist())
+    chall_top = set(np.argpartition(challenger, -k)[-k:].tolist())
+    stats = {
+        "rows": int(len(champion)),
+        "agreement": float((champ_flag == chall_flag).mean()),
+        "champion_flagged": float(champ_flag.mean()),
+        "challenger_flagged": float(chall_flag.mean()),
+        "mean_abs_diff": float(np.abs(champion - challenger).mean()),
+        "rank_corr": float(np.corrcoef(_ranks(champion), _ranks(challenger))[0, 1]) if len(champion) > 1 else 1.0,
+        "top_decile_overlap": len(champ_top & chall_top) / k,
+    }
+    if labels is not None:
+        stats["champion_lift"] = _top_lift(champion, labels)
+        stats["challenger_lift"] = _top_lift(challenger, labels)
+    return stats
+
+
+class ShadowScorer:
+    """Scores every batch with a challenger next to the champion.
+
+    The champion result is returned straight away; the challenger runs on a
+    single background thread, so the page never waits for it. When both
+    pipelines share the same fitted preprocessing, the champion's transformed
+    matrix is handed to the challenger's estimator instead of transforming
+    the batch twice. Each batch appends both score arrays to scores/ and one
+    JSON line of statistics to shadow_log.jsonl.
+    """
+
+    def __init__(self, champion, champion_threshold, challenger_data, log_dir=None):
+        self.champion = champion
+        self.champion_threshold = champion_threshold
+        self.challenger = challenger_data["pipeline"]
+        self.challenger_threshold = challenger_data.get("threshold", champion_threshold)
+        self.shared = same_preprocessing(champion, self.challenger)
+        self.challenger_key = joblib.hash(self.challenger)[:12]
+        self.log_dir = log_dir or default_shadow_dir()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="shadow")
+        self._seen = set()
+        self._lock = threading.Lock()
+
+    def score(self, df, champion_probs=None, labels=None):
+        """Champion churn probabilities for df; the challenger is queued.
+
+        Pass champion_probs when the champion was scored elsewhere (cache,
+        delta mode); the challenger then transforms the batch itself. labels
+        are the known outcomes of df's rows, if any, and add lift to the log;
+        by default they are taken from a LABEL_COL column of df.
+        """
+        if labels is None and LABEL_COL in df.columns:
+            labels = df[LABEL_COL]
+        if labels is not None:
+            labels = pd.to_numeric(pd.Series(labels), errors="coerce")
+            # lift needs an outcome for every row
+            labels = labels.to_numpy(dtype=int) if labels.notna().all() else None
+        if champion_probs is not None:
+            # shallow copy: callers add columns to df after this returns
+            self._executor.submit(self._shadow, df.copy(deep=False), None, np.asarray(champion_probs), labels)
+            return champion_probs
+        if self.shared:
+            features = self.champion[:-1].transform(df)
+            probs = self.champion[-1].predict_proba(features)[:, 1]
+            self._executor.submit(self._shadow, None, features, probs, labels)
+        else:
+            probs = self.champion.predict_proba(df)[:, 1]
+            self._executor.submit(self._shadow, df.copy(deep=False), None, probs, labels)
+        return probs
+
+    def _shadow(self, df, features, champion_probs, labels):
+        try:
+            key = hashlib.sha1(np.ascontiguousarray(champion_probs).tobytes()).hexdigest()[:16]
+            with self._lock:
+                # Streamlit reruns the page on every widget change; log each batch once,
+                # also across restarts and worker processes sharing the log
+                if key in self._seen or os.path.exists(self._scores_path(key)):
+                    return
+                self._seen.add(key)
+
+            start = time.perf_counter()
+            if features is not None:
+                challenger_probs = self.challenger[-1].predict_proba(features)[:, 1]
+            else:
+                challenger_probs = self.challenger.predict_proba(df)[:, 1]
+            seconds = time.perf_counter() - start
+
+            record = {"time": time.time(), "batch": key, "challenger": self.challenger_key,
+                      "challenger_seconds": round(seconds, 4),
+                      "shared_features": features is not None}
+            record.update(compare_scores(champion_probs, challenger_probs, self.champion_threshold,
+                                         self.challenger_threshold, labels))
+            self._write(key, champion_probs, challenger_probs, record)
+        except Exception:
+            logger.exception("shadow scoring failed")
+
+    def _scores_path(self, key):
+        return os.path.join(self.log_dir, "scores", f"{self.challenger_key}_{key}.npz")
+
+    def _write(self, key, champion_probs, challenger_probs, record):
+        def _save(tmp):
+            with open(tmp, "wb") as f:
+                np.savez(f, champion=champion_probs, challenger=challenger_probs)
+
+        atomic_write(self._scores_path(key), _save)
+        with self._lock, open(os.path.join(self.log_dir, "shadow_log.jsonl"), "a") as f:
+            f.write(json.dumps(record) + "\n")
+        logger.info(json.dumps(record))
+
+    def wait(self):
+        """Block until queued challenger work is done (scripts and benchmarks)"""
+        self._executor.submit(lambda: None).result()
+
+
+def shadow_history(log_dir=None):
+    """Logged shadow statistics as a DataFrame, oldest batch first"""
+    path = os.path.join(log_dir or default_shadow_dir(), "shadow_log.jsonl")
+    if not os.path.exists(path):
+        return pd.DataFrame()
+    with open(path) as f:
+        history = pd.DataFrame([json.loads(line) for line in f if line.strip()])
+    history["time"] = pd.to_datetime(history["time"], unit="s")
+    return history.sort_values("time").reset_index(drop=True)
@@ -0,0 +1,127 @@
+# Shared model and score cache for multi-process deployments
+import glob
+import hashlib
+import os
+import tempfile
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from utils.model_utils import MODEL_PATH, REPORT_PATH, load_churn_model
+
+# Set by launch_cluster.py; when unset every process keeps its own copies
+SHARED_CACHE_ENV = "CHURN_SHARED_CACHE_DIR"
+
+# Oldest scored batches are pruned beyond this many files
+MAX_CACHED_BATCHES = 256
+
+
+def shared_cache_dir():
+    """Return the shared cache directory, or None when running single-process"""
+    return os.getenv(SHARED_CACHE_ENV) or None
+
+
+def atomic_write(path, write):
+    """Write to a temp file next to path and rename, so readers never see partial files"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    os.close(fd)
+    try:
+        write(tmp)
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+def source_hash():
+    """Content hash of the model artifact and report the dump is built from"""
+    digest = hashlib.sha1()
+    for path in (MODEL_PATH, REPORT_PATH):
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+    return digest.hexdigest()[:16]
+
+
+def export_shared_model(cache_dir):
+    """Dump model_data once per artifact version, uncompressed, so every worker can memory-map it.
+
+    The dump is named after the source files' hash, so a retrained or
+    updated artifact gets a fresh dump (and a new model_key for the score
+    cache) instead of the old one being reused.
+    """
+    path = os.path.join(cache_dir, f"model_{source_hash()}.joblib")
+    if not os.path.exists(path):
+        model_data = load_churn_model()
+        model_data["model_key"] = joblib.hash(model_data["pipeline"])
+        atomic_write(path, lambda tmp: joblib.dump(model_data, tmp))
+        # older dumps stay readable for workers that still map them until they exit
+        for old in glob.glob(os.path.join(cache_dir, "model*.joblib")):
+            if old != path:
+                try:
+                    os.remove(old)
+                except OSError:
+                    pass
+    return path
+
+
+def load_shared_model(cache_dir):
+    """Load model_data with its numpy arrays memory-mapped from the shared dump.
+
+    The OS page cache holds a single copy of the arrays no matter how many
+    worker processes load them.
+    """
+    return joblib.load(export_shared_model(cache_dir), mmap_mode="r")
+
+
+def batch_key(df, model_key):
+    """Content hash of a batch (values, columns and model) used as cache key"""
+    digest = hashlib.sha1(model_key.encode())
+    digest.update(",".join(map(str, df.columns)).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=False).values.tobytes())
+    return digest.hexdigest()
+
+
+def _prune_scores(scores_dir):
+    files = glob.glob(os.path.join(scores_dir, "*.npy"))
+    if len(files) <= MAX_CACHED_BATCHES:
+        return
+    files.sort(key=os.path.getmtime)
+    for path in files[:len(files) - MAX_CACHED_BATCHES]:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def predict_churn_proba(pipeline, df, model_key=None):
+    """Return churn probabilities for df.
+
+    In a shared deployment, scores computed by any worker are stored as
+    ``.npy`` files in the shared cache and memory-mapped on a hit, so the same
+    upload is scored once for all sessions across all processes.
+    """
+    cache_dir = shared_cache_dir()
+    if cache_dir is None or model_key is None:
+        return pipeline.predict_proba(df)[:, 1]
+
+    scores_dir = os.path.join(cache_dir, "scores")
+    path = os.path.join(scores_dir, f"{batch_key(df, model_key)}.npy")
+    if os.path.exists(path):
+        try:
+            return np.load(path, mmap_mode="r")
+        except (OSError, ValueError):
+            pass  # pruned or unreadable - rescore below
+
+    probs = pipeline.predict_proba(df)[:, 1]
+
+    def _save(tmp):
+        # np.save appends ".npy" to bare paths, so hand it a file object
+        with open(tmp, "wb") as f:
+            np.save(f, probs)
+
+    atomic_write(path, _save)
+    _prune_scores(scores_dir)
+    return probs
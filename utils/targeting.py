@@ -0,0 +1,101 @@
+# Budget-constrained retention target selection
+import heapq
+
+import numpy as np
+import pandas as pd
+
+# Same business assumptions as utils.kpi_calculator
+CUSTOMER_VALUE = 1000   # value of retaining a customer who would churn ($)
+PROMOTION_COST = 200    # cost of one retention offer ($)
+
+
+def expected_value(probs, customer_value=CUSTOMER_VALUE, promotion_cost=PROMOTION_COST):
+    """Expected value of contacting each customer.
+
+    A contacted churner is worth customer_value; an offer sent to a customer
+    who would have stayed anyway costs promotion_cost.
+    """
+    probs = np.asarray(probs, dtype=float)
+    return probs * customer_value - (1 - probs) * promotion_cost
+
+
+def budget_to_k(budget, promotion_cost=PROMOTION_COST):
+    """How many customers the campaign budget can contact"""
+    return int(budget // promotion_cost) if promotion_cost > 0 else 0
+
+
+def _top_k_positions(ev, k):
+    """Positions of the k largest positive values, best first.
+
+    argpartition finds the top k in O(n); only those k are then sorted.
+    """
+    positive = np.flatnonzero(ev > 0)
+    if k <= 0 or not len(positive):
+        return positive[:0]
+    if k < len(positive):
+        part = np.argpartition(ev[positive], -k)[-k:]
+        positive = positive[part]
+    return positive[np.argsort(-ev[positive], kind="stable")]
+
+
+def select_targets(df, budget, customer_value=CUSTOMER_VALUE, promotion_cost=PROMOTION_COST,
+                   prob_col="churn_prob"):
+    """Best customers to contact within budget, highest expected value first.
+
+    Customers with non-positive expected value are never selected, so the
+    list may be shorter than the budget allows.
+    """
+    ev = expected_value(df[prob_col].to_numpy(), customer_value, promotion_cost)
+    pos = _top_k_positions(ev, budget_to_k(budget, promotion_cost))
+    targets = df.iloc[pos].copy()
+    targets["expected_value"] = ev[pos]
+    return targets
+
+
+class StreamingTargets:
+    """Running top-k target list over scored chunks, in bounded memory.
+
+    Each chunk is first cut to its own top k with argpartition; only those
+    candidates go through a k-sized min-heap.
+    """
+
+    def __init__(self, budget, customer_value=CUSTOMER_VALUE, promotion_cost=PROMOTION_COST,
+                 prob_col="churn_prob"):
+        self.k = budget_to_k(budget, promotion_cost)
+        self.customer_value = customer_value
+        self.promotion_cost = promotion_cost
+        self.prob_col = prob_col
+        self._heap = []   # (expected_value, sequence, row dict)
+        self._seq = 0
+
+    def add(self, chunk):
+        ev = expected_value(chunk[self.prob_col].to_numpy(), self.customer_value, self.promotion_cost)
+        pos = _top_k_positions(ev, self.k)
+        for p, rec in zip(pos, chunk.iloc[pos].to_dict("records")):
+            item = (float(ev[p]), self._seq, rec)
+            self._seq += 1
+            if len(self._heap) < self.k:
+                heapq.heappush(self._heap, item)
+            elif item[0] > self._heap[0][0]:
+                heapq.heapreplace(self._heap, item)
+            else:
+                break  # pos is sorted best-first, nothing later can qualify
+        return self
+
+    def result(self):
+        items = sorted(self._heap, key=lambda item: (-item[0], item[1]))
+        targets = pd.DataFrame([rec for _, _, rec in items])
+        targets["expected_value"] = [ev for ev, _, _ in items]
+        return targets
+
+
+def summarize_targets(targets, budget, promotion_cost=PROMOTION_COST, prob_col="churn_prob"):
+    """Campaign summary for a target list"""
+    contacted = len(targets)
+    return {
+        "contacted": contacted,
+        "spend": contacted * promotion_cost,
+        "unused_budget": budget - contacted * promotion_cost,
+        "expected_saves": float(targets[prob_col].sum()) if contacted else 0.0,
+        "expected_value": float(targets["expected_value"].sum()) if contacted else 0.0,
+    }
@@ -0,0 +1,110 @@
+# Lightweight per-stage timing for app runs
+import contextlib
+import functools
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+
+logger = logging.getLogger("churn.timing")
+
+# "1" times every session, not just the ones with the performance panel open
+TIMING_ENV = "CHURN_TIMING"
+# Optional JSON-lines file that timing records are appended to
+TIMING_LOG_ENV = "CHURN_TIMING_LOG"
+
+# Streamlit runs each session's script in its own thread
+_local = threading.local()
+_NULL = contextlib.nullcontext()
+_log_lock = threading.Lock()
+
+
+def always_enabled():
+    """True when CHURN_TIMING=1 asks for timing on every run"""
+    return os.getenv(TIMING_ENV) == "1"
+
+
+class _Timer:
+    __slots__ = ("records", "stage", "rows", "start")
+
+    def __init__(self, records, stage, rows):
+        self.records = records
+        self.stage = stage
+        self.rows = rows
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.records.append({
+            "stage": self.stage,
+            "ms": (time.perf_counter() - self.start) * 1000,
+            "rows": self.rows,
+        })
+        return False
+
+
+def timed(stage, rows=None):
+    """Context manager timing one stage of the current run.
+
+    Outside a run started with start_run() this returns a shared
+    nullcontext, so disabled timing costs one attribute lookup.
+    """
+    run = getattr(_local, "run", None)
+    if run is None:
+        return _NULL
+    return _Timer(run["records"], stage, rows)
+
+
+def timed_fn(stage):
+    """Decorator form of timed()"""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with timed(stage):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def start_run(page=None, session=None):
+    """Begin collecting timings for this thread's script run"""
+    _local.run = {
+        "run_id": uuid.uuid4().hex[:12],
+        "page": page,
+        "session": session,
+        "records": [],
+    }
+
+
+def set_page(page):
+    """Tag the current run with the page being rendered"""
+    run = getattr(_local, "run", None)
+    if run is not None:
+        run["page"] = page
+
+
+def finish_run():
+    """Stop collecting, emit structured log records and return the timings"""
+    run = getattr(_local, "run", None)
+    _local.run = None
+    if run is None:
+        return []
+
+    ts = time.time()
+    lines = [
+        json.dumps({"ts": ts, "run_id": run["run_id"], "session": run["session"],
+                    "page": run["page"], **rec})
+        for rec in run["records"]
+    ]
+    for line in lines:
+        logger.info(line)
+
+    path = os.getenv(TIMING_LOG_ENV)
+    if path and lines:
+        with _log_lock, open(path, "a") as f:
+            f.write("\n".join(lines) + "\n")
+    return run["records"]